@@ -0,0 +1,57 @@
+"""
+Build the deep-agent-claude E2B sandbox template.
+
+The template extends E2B's MCP gateway template with Claude CLI already
+pointed at the in-sandbox gateway, so DeepAgentE2B(template=TEMPLATE_ALIAS)
+skips the per-sandbox `claude mcp add` round trip. The gateway's access token
+is generated per sandbox; the config reads it from E2B_MCP_TOKEN, which the
+CLI fallback in e2b_tools passes with each command.
+
+Usage:
+    uv run build_template.py
+"""
+
+import json
+import shlex
+
+import dotenv
+from e2b import Sandbox, Template, default_build_logger
+
+TEMPLATE_ALIAS = "deep-agent-claude"
+
+# Project-scoped MCP config in the sandbox user's home (the default working
+# directory of sandbox commands); Claude CLI expands ${E2B_MCP_TOKEN} at startup
+_MCP_CONFIG = {
+    "mcpServers": {
+        "e2b-mcp-gateway": {
+            "type": "http",
+            "url": f"http://localhost:{Sandbox.mcp_port}/mcp",
+            "headers": {"Authorization": "Bearer ${E2B_MCP_TOKEN}"},
+        }
+    }
+}
+
+# Approve the project's MCP servers up front; `claude -p` cannot prompt for it
+_CLAUDE_SETTINGS = {"enableAllProjectMcpServers": True}
+
+
+def main():
+    """Build the template and register it under TEMPLATE_ALIAS."""
+    dotenv.load_dotenv()
+
+    template = Template().from_template(Sandbox.default_mcp_template).run_cmd(
+        [
+            f"printf %s {shlex.quote(json.dumps(_MCP_CONFIG))} > /home/user/.mcp.json",
+            "mkdir -p /home/user/.claude",
+            f"printf %s {shlex.quote(json.dumps(_CLAUDE_SETTINGS))} > /home/user/.claude/settings.json",
+        ],
+        user="user",
+    )
+
+    Template.build(template, alias=TEMPLATE_ALIAS, on_build_logs=default_build_logger())
+    print(f"\nTemplate built: {TEMPLATE_ALIAS}")
+    print(f"Use it with DeepAgentE2B(template=\"{TEMPLATE_ALIAS}\")")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
+import inspect
+from importlib.metadata import version
 
-import e2b
-print(f"E2B Version: {e2b.__version__}")
 from e2b import Sandbox
-print("Sandbox attributes:")
-print([a for a in dir(Sandbox) if "mcp" in a.lower()])
-try:
-    sb = Sandbox.create(api_key="test") # This might fail auth but we just want to see instance attributes if possible, or class attributes
-except:
-    pass
 
+print(f"E2B Version: {version('e2b')}")
+
+# Class introspection only: no sandbox is created, so this never touches the network
+print("Sandbox MCP members:")
+for name, member in inspect.getmembers(Sandbox):
+    if "mcp" in name.lower():
+        kind = "method" if callable(member) else type(member).__name__
+        print(f"  {name} ({kind})")
@@ -10,22 +10,309 @@ is preserved in legacy_deep_agent.py for reference.
 """
 
 import asyncio
+import atexit
+import json
+import logging
 import os
-from typing import Annotated, Optional, TypedDict, Literal, Sequence
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, suppress
+from functools import lru_cache, wraps
+from typing import TYPE_CHECKING, Annotated, Optional, TypedDict, Literal, Sequence
 import dotenv
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
-from langchain_anthropic import ChatAnthropic
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    message_chunk_to_message,
+    trim_messages,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 from langgraph.graph.message import add_messages
-from e2b import Sandbox
+from e2b import CommandExitException, Sandbox
 from e2b.sandbox.mcp import GithubOfficial, Notion, McpServer
 from e2b.exceptions import AuthenticationException
-from e2b_tools import E2BSandboxTools
+from e2b_tools import (
+    MCP_CLI_ENVS,
+    READ_ONLY_ACTION_RE,
+    E2BSandboxTools,
+    TTLCache,
+    drop_mcp_session,
+)
 from mcp_builder_tools import MCPBuilderTools
 
-dotenv.load_dotenv()
+if TYPE_CHECKING:
+    # Heavy client libraries, imported for annotations only; the runtime
+    # import happens when the first model is built
+    from langchain_anthropic import ChatAnthropic
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+
+logger = logging.getLogger(__name__)
+
+# Echoed by the bootstrap command to prove the sandbox command channel works
+_SANDBOX_SENTINEL = "E2B_SANDBOX_OK"
+
+# Static system prompt, built once at import time
+_SYSTEM_PROMPT = """You are an advanced autonomous agent with access to an E2B sandbox environment.
+
+You have the following capabilities:
+
+1. **Planning & Reasoning**: Break down complex tasks into clear, actionable steps
+2. **E2B Sandbox Execution**: Execute commands, manage files, and run code securely
+   - Use 'batch_execute_sandbox_commands' to run several independent commands in one round trip
+3. **GitHub Integration**: Access repositories, create issues, manage code
+   - Use 'get_me' to get your GitHub username first
+   - Use 'search_repositories' with query 'user:YOUR_USERNAME' to list repos
+   - Use 'get_repository' with query 'owner/repo' for repo details
+4. **Notion Integration**: Create pages, search databases, organize information
+5. **File System Management**: Read, write, and organize files
+   - Use 'read_sandbox_files' to read several files in one round trip
+6. **MCP Server Building**: Build custom MCP servers to extend your capabilities
+   - Use 'scaffold_mcp_server' to create new integration scaffolds
+   - Use 'add_mcp_tool_to_server' to add tools
+   - Use 'test_mcp_server' to validate servers
+   - Use 'deploy_mcp_server' to make integrations available ('deploy_mcp_servers_batch' for several at once)
+
+Your workflow:
+1. Understand the user's request
+2. Plan your approach (think step-by-step)
+3. Execute tasks using available tools
+4. Verify results and iterate if needed
+5. Report results clearly
+
+**Critical Guidelines:**
+- Always check for empty datasets before division
+- Verify API responses before processing
+- Handle errors gracefully with clear messages
+- Report progress as you work
+- Ask clarifying questions if needed
+
+Remember: You're in a secure E2B sandbox, so you can safely execute code and experiments."""
+
+# The system parameter sent with every model call. The cache breakpoint makes
+# Anthropic cache the whole static prefix (tool definitions, then this prompt),
+# so later calls bill it at the cache-read rate instead of re-processing it.
+_SYSTEM_BLOCKS = (
+    {"type": "text", "text": _SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}},
+)
+
+# Expected key shapes, checked locally so a malformed key fails immediately
+# instead of after a sandbox/API round trip that ends in a 401.
+_E2B_KEY_RE = re.compile(r"e2b_[A-Za-z0-9]{32,}")
+_ANTHROPIC_KEY_RE = re.compile(r"sk-ant-[A-Za-z0-9_\-]{20,}")
+
+# MCP servers wired into the sandbox gateway when their token is available:
+# (McpServer field, DeepAgentE2B token attribute, server class, token kwarg)
+_MCP_FACTORIES = (
+    ("githubOfficial", "github_token", GithubOfficial, "githubPersonalAccessToken"),
+    ("notion", "notion_token", Notion, "internalIntegrationToken"),
+)
+
+# Number of user turns kept in chat() history; older turns are dropped so the
+# payload sent to the model each turn stays bounded on long sessions.
+MAX_CHAT_TURNS = 20
+
+# Tools whose result depends only on their arguments within a session; repeated
+# calls with the same arguments are answered from the agent's tool-result cache
+_CACHEABLE_TOOL_RE = re.compile(r"list_\w+")
+
+# Tools that only read state; a call to any other tool may change what the
+# cached tools would return, so it clears the cache
+_READ_ONLY_TOOL_RE = re.compile(r"(get|read|list|search)_\w+")
+
+# MCP action tools; these clear the cache only for actions that are not
+# read-only (e2b_tools caches the read-only MCP results itself)
+_MCP_ACTION_TOOL_RE = re.compile(r"execute_\w+_mcp_action")
+
+# Seconds each long-running tool may take by default; with extend_on_progress
+# the sandbox is kept alive at least this long (or the call's own ``timeout``)
+# before the tool runs, so it cannot expire mid-call
+_TOOL_TIMEOUTS = {
+    "install_sandbox_package": 300,
+    "execute_github_mcp_action": 120,
+    "execute_notion_mcp_action": 120,
+    "execute_sandbox_command": 60,
+    "batch_execute_sandbox_commands": 60,
+}
+
+# astream_events() event types passed on by DeepAgentE2B.astream
+_STREAM_EVENTS = frozenset({"on_chat_model_stream", "on_tool_end"})
+
+# Approximate token budget for the history sent with each model call; older
+# user turns are dropped once it is exceeded, well below the context window
+MAX_CONTEXT_TOKENS = 150_000
+
+# Environment variables read by DeepAgentE2B; when all are already set there is
+# nothing for .env to contribute and parsing it is skipped.
+_ENV_KEYS = ("ANTHROPIC_API_KEY", "E2B_API_KEY", "GITHUB_TOKEN", "NOTION_TOKEN")
+
+# mtime of the last .env file loaded, so repeated agent construction in one
+# process does not re-parse an unchanged file.
+_dotenv_mtime: Optional[float] = None
+
+
+def _load_dotenv() -> None:
+    """Load .env lazily, skipping the parse when it cannot change anything."""
+    global _dotenv_mtime
+
+    getenv = os.getenv
+    if all(getenv(key) for key in _ENV_KEYS):
+        return
+
+    path = dotenv.find_dotenv()
+    if not path:
+        return
+
+    mtime = os.stat(path).st_mtime
+    if mtime == _dotenv_mtime:
+        return
+
+    dotenv.load_dotenv(path)
+    _dotenv_mtime = mtime
+
+
+@lru_cache(maxsize=16)
+def mask_secret(value: Optional[str]) -> str:
+    """Return a redacted preview of a secret (cached: the same keys are masked repeatedly)."""
+    if not value:
+        return "<missing>"
+    return f"{value[:4]}...{value[-4:]}" if len(value) > 8 else f"{value[0]}***{value[-1]}"
+
+
+# Process-wide ChatAnthropic instances keyed by (api_key, model_name), so every
+# agent in the process (legacy included) shares one client and its HTTP
+# connection pool.
+_CLIENT_CACHE: dict[tuple[str, str], "ChatAnthropic"] = {}
+
+
+def get_chat_model(api_key: str, model_name: str) -> "ChatAnthropic":
+    """Return the shared ChatAnthropic client for this key and model."""
+    key = (api_key, model_name)
+    model = _CLIENT_CACHE.get(key)
+    if model is None:
+        from langchain_anthropic import ChatAnthropic
+
+        model = _CLIENT_CACHE[key] = ChatAnthropic(
+            model=model_name,
+            anthropic_api_key=api_key,
+            temperature=0.7,
+        )
+    return model
+
+
+# Anthropic tool definitions keyed by the tuple of tool names. Every agent
+# exposes the same tools (only the sandbox they act on differs), so the JSON
+# schemas are generated once per process instead of on every bind_tools().
+_TOOL_SCHEMA_CACHE: dict[tuple[str, ...], list[dict]] = {}
+
+
+def _tool_schemas(tools: list) -> list[dict]:
+    """Return the (shared) Anthropic tool definitions for these tools."""
+    key = tuple(tool.name for tool in tools)
+    schemas = _TOOL_SCHEMA_CACHE.get(key)
+    if schemas is None:
+        from langchain_anthropic import convert_to_anthropic_tool
+
+        schemas = _TOOL_SCHEMA_CACHE[key] = [convert_to_anthropic_tool(tool) for tool in tools]
+    return schemas
+
+
+def close_clients() -> None:
+    """Drop all pooled model clients (e.g. before process shutdown or key rotation)."""
+    _CLIENT_CACHE.clear()
+
+
+def _trim_to_recent_turns(messages: list[BaseMessage], max_turns: int) -> list[BaseMessage]:
+    """
+    Keep only the messages belonging to the last ``max_turns`` user turns.
+
+    History is cut at HumanMessage boundaries so an AIMessage carrying tool
+    calls is never separated from the ToolMessages that answer it.
+    """
+    turns = 0
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            turns += 1
+            if turns == max_turns:
+                return messages[index:] if index else messages
+    return messages
+
+
+def _trim_to_token_budget(messages: list[BaseMessage], max_tokens: int) -> list[BaseMessage]:
+    """
+    Drop the oldest user turns until the history fits in ``max_tokens``.
+
+    Like _trim_to_recent_turns, history is only cut at HumanMessage
+    boundaries; the current turn is always kept whole, even if on its own it
+    exceeds the budget. Tokens are estimated locally, without an API call.
+    """
+    trimmed = trim_messages(
+        messages,
+        max_tokens=max_tokens,
+        strategy="last",
+        token_counter=count_tokens_approximately,
+        start_on="human",
+    )
+    if trimmed:
+        return trimmed
+    return _trim_to_recent_turns(messages, 1)
+
+
+# Idle sandboxes returned by DeepAgentE2B.release(), keyed by everything that
+# shapes a sandbox at creation time (account, envs, MCP servers, timeout), so a
+# new agent with the same configuration can skip the cold boot.
+_SANDBOX_POOL: dict[tuple, list[Sandbox]] = {}
+_SANDBOX_POOL_LOCK = threading.Lock()
+
+
+def _checkout_sandbox(pool_key: tuple, timeout: int) -> Optional[Sandbox]:
+    """
+    Take a live sandbox from the pool, evicting any that stopped responding.
+
+    An idle sandbox has an unknown amount of its lifetime left, so it is given
+    a fresh ``timeout`` (seconds) before it is handed out.
+    """
+    while True:
+        with _SANDBOX_POOL_LOCK:
+            idle = _SANDBOX_POOL.get(pool_key)
+            if not idle:
+                return None
+            sandbox = idle.pop()
+        try:
+            sandbox.set_timeout(timeout)
+            sandbox.commands.run("true", timeout=5)
+            return sandbox
+        except Exception:
+            logger.info("  Evicting stale pooled sandbox (ID: %s)", sandbox.sandbox_id)
+            drop_mcp_session(sandbox.sandbox_id)
+            with suppress(Exception):
+                sandbox.kill()
+
+
+def drain_sandbox_pool() -> None:
+    """Kill every idle pooled sandbox (e.g. before process shutdown)."""
+    with _SANDBOX_POOL_LOCK:
+        idle = [sandbox for sandboxes in _SANDBOX_POOL.values() for sandbox in sandboxes]
+        _SANDBOX_POOL.clear()
+    for sandbox in idle:
+        drop_mcp_session(sandbox.sandbox_id)
+        with suppress(Exception):
+            sandbox.kill()
+
+
+# Pooled sandboxes are only useful to this process; kill them at exit instead
+# of leaving them billed until their timeout
+atexit.register(drain_sandbox_pool)
 
 
 class AgentState(TypedDict):
@@ -55,6 +342,14 @@ class DeepAgentE2B:
         model_name: str = "claude-sonnet-4-5-20250929",
         sandbox_timeout: int = 600,
         max_iterations: int = 25,
+        reuse_sandbox: bool = True,
+        verify_channel: bool = False,
+        sandbox: Optional[Sandbox] = None,
+        extend_on_progress: bool = False,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+        tool_cache_ttl: float = 300,
+        template: Optional[str] = None,
+        keep_sandbox: bool = False,
     ):
         """
         Initialize the Deep Agent with E2B integration.
@@ -67,143 +362,211 @@ class DeepAgentE2B:
             model_name: Claude model to use
             sandbox_timeout: E2B sandbox timeout in seconds
             max_iterations: Maximum agent iterations to prevent infinite loops
+            reuse_sandbox: Check out an idle sandbox with the same configuration
+                from the process-wide pool instead of booting a new one
+            verify_channel: Echo a sentinel through a new sandbox to verify the
+                command channel (pooled sandboxes are always checked on checkout)
+            sandbox: An already bootstrapped sandbox to use (e.g. one reconnected
+                with Sandbox.connect); the caller keeps ownership, so it is
+                neither pooled nor killed when the agent closes
+            extend_on_progress: Treat sandbox_timeout as an idle window rather
+                than a lifetime: each agent step and tool call pushes the
+                sandbox's timeout back out (tool calls by at least their own
+                timeout), so a short timeout suffices for short tasks without
+                cutting off long ones
+            checkpointer: LangGraph checkpointer holding conversation threads
+                (defaults to an in-memory saver; pass e.g. a SqliteSaver to
+                persist threads across processes)
+            tool_cache_ttl: Seconds a listing tool result (list_sandbox_directory,
+                list_mcp_servers) is reused for identical arguments; 0
+                disables the cache
+            template: E2B template to create sandboxes from. A template built by
+                build_template.py has Claude CLI registered with the MCP
+                gateway already, so the registration command is skipped
+            keep_sandbox: With reuse_sandbox=False, leave the sandbox running
+                when the agent closes (e.g. to reconnect to it later) instead
+                of killing it
         """
-        # Load API keys
-        self.anthropic_api_key = anthropic_api_key or os.environ.get("ANTHROPIC_API_KEY")
-        self.e2b_api_key = e2b_api_key or os.environ.get("E2B_API_KEY")
-        self.github_token = github_token or os.environ.get("GITHUB_TOKEN")
-        self.notion_token = notion_token or os.environ.get("NOTION_TOKEN")
+        _load_dotenv()
+
+        # Load API keys (bind the lookup once instead of resolving os.environ per key)
+        getenv = os.getenv
+        self.anthropic_api_key = anthropic_api_key or getenv("ANTHROPIC_API_KEY")
+        self.e2b_api_key = e2b_api_key or getenv("E2B_API_KEY")
+        self.github_token = github_token or getenv("GITHUB_TOKEN")
+        self.notion_token = notion_token or getenv("NOTION_TOKEN")
 
         if not self.anthropic_api_key:
             raise ValueError("ANTHROPIC_API_KEY must be provided or set in environment")
         if not self.e2b_api_key:
             raise ValueError("E2B_API_KEY must be provided or set in environment")
+        if not _ANTHROPIC_KEY_RE.fullmatch(self.anthropic_api_key):
+            raise ValueError(
+                f"ANTHROPIC_API_KEY is malformed ({mask_secret(self.anthropic_api_key)}); "
+                "expected 'sk-ant-...' with no whitespace"
+            )
+        if not _E2B_KEY_RE.fullmatch(self.e2b_api_key):
+            raise ValueError(
+                f"E2B_API_KEY is malformed ({mask_secret(self.e2b_api_key)}); "
+                "expected 'e2b_...' with no whitespace"
+            )
 
         self.model_name = model_name
         self.sandbox_timeout = sandbox_timeout
         self.max_iterations = max_iterations
+        self.reuse_sandbox = reuse_sandbox
+        self.verify_channel = verify_channel
+        self.extend_on_progress = extend_on_progress
+        self.template = template
+        self.keep_sandbox = keep_sandbox
+        self.checkpointer = checkpointer if checkpointer is not None else InMemorySaver()
+        self._tool_cache = TTLCache(maxsize=512, ttl=tool_cache_ttl) if tool_cache_ttl > 0 else None
+        self.tool_cache_hits = 0
+        # When the sandbox's current timeout runs out (monotonic clock); a
+        # passed-in sandbox's remaining time is unknown, so it starts expired
+        self._sandbox_deadline = 0.0
         self.sandbox: Optional[Sandbox] = None
+        self._pool_key: Optional[tuple] = None
         self.tools = []
-        self.mcp_client: Optional[MultiServerMCPClient] = None
+        self.mcp_client: Optional["MultiServerMCPClient"] = None
         self.graph = None
-
-        # Initialize components
-        self._setup_sandbox()
-        self._setup_graph()
+        self._run_cmd = None
+        self._graph_stream = None
+        self._external_sandbox = sandbox
+
+        # Initialize components. Sandbox creation (network bound) and model
+        # construction are independent, so overlap them before wiring the graph.
+        # If any step fails after the sandbox exists, kill it rather than leave
+        # a billed VM running until its timeout.
+        with ExitStack() as stack:
+            stack.callback(self._kill_sandbox)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                sandbox_future = executor.submit(self._setup_sandbox)
+                model_future = executor.submit(self._build_model)
+                sandbox_future.result()
+                model = model_future.result()
+            self._setup_graph(model)
+            stack.pop_all()
 
     def _setup_sandbox(self):
-        """Create and configure the E2B sandbox with MCP servers."""
-        print("Creating E2B sandbox with MCP servers...")
-
-        # Configure MCP servers
-        mcp_servers_config = {}
-
-        if self.github_token:
-            github = GithubOfficial(githubPersonalAccessToken=self.github_token)
-            mcp_servers_config["githubOfficial"] = github
-            print("  GitHub MCP server configured")
-
-        if self.notion_token:
-            notion = Notion(internalIntegrationToken=self.notion_token)
-            mcp_servers_config["notion"] = notion
-            print("  Notion MCP server configured")
-
-        mcp_servers = McpServer(**mcp_servers_config) if mcp_servers_config else None
-
-        # Create sandbox
-        try:
-            self.sandbox = Sandbox.beta_create(
-                envs={"ANTHROPIC_API_KEY": self.anthropic_api_key},
-                mcp=mcp_servers,
-                timeout=self.sandbox_timeout,
-                api_key=self.e2b_api_key,
-            )
-        except AuthenticationException as exc:
-            raise RuntimeError(
-                "Failed to create E2B sandbox due to authentication error."
-            ) from exc
-
-        sandbox_id = getattr(self.sandbox, "sandbox_id", "unknown")
-        print(f"  Sandbox created (ID: {sandbox_id})")
+        """Create (or check out a pooled) E2B sandbox with MCP servers."""
+        envs = {"ANTHROPIC_API_KEY": self.anthropic_api_key, **MCP_CLI_ENVS}
+        mcp_tokens = tuple((key, getattr(self, attr)) for key, attr, _, _ in _MCP_FACTORIES)
+        self._pool_key = (
+            self.e2b_api_key, frozenset(envs.items()), mcp_tokens, self.sandbox_timeout, self.template,
+        )
 
-        self._verify_sandbox_command_channel()
+        existing = self._external_sandbox
+        if existing is None and self.reuse_sandbox:
+            existing = _checkout_sandbox(self._pool_key, self.sandbox_timeout)
+            if existing is not None:
+                # Checkout gave the pooled sandbox a fresh timeout
+                self._sandbox_deadline = time.monotonic() + self.sandbox_timeout
+        warm = existing is not None
+        if warm:
+            self.sandbox = existing
+            logger.info("Reusing E2B sandbox (ID: %s)", existing.sandbox_id)
+        else:
+            logger.info("Creating E2B sandbox with MCP servers...")
 
-        # Create tools
-        self.tools = E2BSandboxTools.create_tools(self.sandbox)
-        print(f"  Created {len(self.tools)} E2B sandbox tools")
+            # Configure MCP servers for every provider that has a token
+            mcp_servers_config = {
+                key: cls(**{kwarg: token})
+                for key, attr, cls, kwarg in _MCP_FACTORIES
+                if (token := getattr(self, attr))
+            }
+            logger.info("  MCP servers: %s", list(mcp_servers_config))
 
-        mcp_builder_tools = MCPBuilderTools.create_tools(self.sandbox)
-        self.tools.extend(mcp_builder_tools)
-        print(f"  Added {len(mcp_builder_tools)} MCP builder tools")
+            mcp_servers = McpServer(**mcp_servers_config) if mcp_servers_config else None
 
-        # Load MCP tools if servers configured
-        if mcp_servers:
+            # Create sandbox
+            try:
+                self.sandbox = Sandbox.beta_create(
+                    template=self.template,
+                    envs=envs,
+                    mcp=mcp_servers,
+                    timeout=self.sandbox_timeout,
+                    api_key=self.e2b_api_key,
+                )
+            except AuthenticationException as exc:
+                raise RuntimeError(
+                    "Failed to create E2B sandbox due to authentication error."
+                ) from exc
+
+            self._sandbox_deadline = time.monotonic() + self.sandbox_timeout
+            sandbox_id = getattr(self.sandbox, "sandbox_id", "unknown")
+            logger.info("  Sandbox created (ID: %s)", sandbox_id)
+            logger.info("  E2B API key detected (%s)", mask_secret(self.e2b_api_key))
+
+        # Bound once; every sandbox command goes through this
+        self._run_cmd = self.sandbox.commands.run
+
+        # Resolve MCP gateway details so optional channel verification and
+        # Claude CLI registration can share a single command round trip
+        mcp_url = mcp_token = None
+        if any(token for _, token in mcp_tokens):
             try:
                 mcp_url = self.sandbox.beta_get_mcp_url()
                 mcp_token = self.sandbox.beta_get_mcp_token()
-                self._configure_mcp_gateway(mcp_url, mcp_token)
-                # Note: MCP tools from langchain-mcp-adapters are async-only
-                # They're incompatible with LangGraph's sync ToolNode
-                # The Claude CLI integration provides MCP access instead
-                print("  MCP tools accessible via Claude CLI (not loaded as LangChain tools)")
             except AttributeError as e:
-                print(f"  Warning: MCP methods not available: {e}")
+                logger.warning("  Warning: MCP methods not available: %s", e)
             except Exception as e:
-                print(f"  Warning: Error setting up MCP gateway: {e}")
+                logger.warning("  Warning: Error setting up MCP gateway: %s", e)
 
-    def _setup_graph(self):
-        """Initialize the LangGraph state machine."""
-        print("Initializing LangGraph state machine...")
+        # A pooled sandbox already passed the liveness check on checkout and
+        # had the gateway registered with Claude CLI by its first owner; a
+        # pre-baked template ships with the registration
+        if not warm:
+            self._bootstrap_sandbox(None if self.template else mcp_url, mcp_token)
 
-        # Create model with tools
-        model = ChatAnthropic(
-            model=self.model_name,
-            anthropic_api_key=self.anthropic_api_key,
-            temperature=0.7,
+        # Create tools
+        # Template sandboxes' Claude CLI reads the gateway token from its env
+        self.tools = E2BSandboxTools.create_tools(
+            self.sandbox, cli_mcp_token=mcp_token if self.template else None
         )
-        self.model_with_tools = model.bind_tools(self.tools)
+        logger.info("  Created %d E2B sandbox tools", len(self.tools))
 
-        # System prompt
-        self.system_prompt = """You are an advanced autonomous agent with access to an E2B sandbox environment.
-
-You have the following capabilities:
-
-1. **Planning & Reasoning**: Break down complex tasks into clear, actionable steps
-2. **E2B Sandbox Execution**: Execute commands, manage files, and run code securely
-3. **GitHub Integration**: Access repositories, create issues, manage code
-   - Use 'get_me' to get your GitHub username first
-   - Use 'search_repositories' with query 'user:YOUR_USERNAME' to list repos
-   - Use 'get_repository' with query 'owner/repo' for repo details
-4. **Notion Integration**: Create pages, search databases, organize information
-5. **File System Management**: Read, write, and organize files
-6. **MCP Server Building**: Build custom MCP servers to extend your capabilities
-   - Use 'scaffold_mcp_server' to create new integration scaffolds
-   - Use 'add_mcp_tool_to_server' to add tools
-   - Use 'test_mcp_server' to validate servers
-   - Use 'deploy_mcp_server' to make integrations available
+        mcp_builder_tools = MCPBuilderTools.create_tools(self.sandbox)
+        self.tools.extend(mcp_builder_tools)
+        logger.info("  Added %d MCP builder tools", len(mcp_builder_tools))
 
-Your workflow:
-1. Understand the user's request
-2. Plan your approach (think step-by-step)
-3. Execute tasks using available tools
-4. Verify results and iterate if needed
-5. Report results clearly
+        if mcp_url:
+            # Note: MCP tools from langchain-mcp-adapters are async-only
+            # They're incompatible with LangGraph's sync ToolNode
+            # The Claude CLI integration provides MCP access instead
+            logger.info("  MCP tools accessible via Claude CLI (not loaded as LangChain tools)")
 
-**Critical Guidelines:**
-- Always check for empty datasets before division
-- Verify API responses before processing
-- Handle errors gracefully with clear messages
-- Report progress as you work
-- Ask clarifying questions if needed
+    def _build_model(self) -> "ChatAnthropic":
+        """Create the chat model (the underlying client is shared process-wide)."""
+        return get_chat_model(self.anthropic_api_key, self.model_name)
 
-Remember: You're in a secure E2B sandbox, so you can safely execute code and experiments."""
+    def _setup_graph(self, model: "ChatAnthropic"):
+        """Initialize the LangGraph state machine."""
+        logger.info("Initializing LangGraph state machine...")
+
+        # Bind the sandbox tools and the system prompt to the model; the prompt
+        # goes out as the request's (cacheable) system parameter on every call,
+        # so it never has to be spliced into the message history
+        self.system_prompt = _SYSTEM_PROMPT
+        self.model_with_tools = model.bind_tools(_tool_schemas(self.tools)).bind(
+            system=list(_SYSTEM_BLOCKS)
+        )
 
         # Build graph
         workflow = StateGraph(AgentState)
 
         # Add nodes
-        workflow.add_node("agent", self._agent_node)
-        workflow.add_node("tools", ToolNode(self.tools))
+        workflow.add_node("agent", RunnableLambda(self._agent_node, afunc=self._aagent_node, name="agent"))
+        # ToolNode runs the tool calls of one model turn concurrently (a thread
+        # pool under invoke, asyncio.gather under ainvoke); a tool that raises
+        # reports the error to the model instead of aborting the whole run
+        workflow.add_node(
+            "tools",
+            ToolNode(
+                self._with_result_cache(self._with_keepalive(self.tools)),
+                handle_tool_errors=True,
+            ),
+        )
 
         # Set entry point
         workflow.set_entry_point("agent")
@@ -222,57 +585,228 @@ Remember: You're in a secure E2B sandbox, so you can safely execute code and exp
         workflow.add_edge("tools", "agent")
 
         # Compile graph
-        self.graph = workflow.compile()
-        print("  LangGraph state machine compiled")
+        self.graph = workflow.compile(checkpointer=self.checkpointer)
+        self._graph_stream = self.graph.stream
+        logger.info("  LangGraph state machine compiled")
 
-    def _agent_node(self, state: AgentState) -> AgentState:
-        """Agent reasoning node - decides what to do next."""
-        messages = state["messages"]
+    def _with_result_cache(self, tools: list) -> list:
+        """
+        Wrap tools so repeated read-only calls are served from the tool-result cache.
+
+        Cacheable tools look up (tool name, arguments) before running. Any
+        tool that is not read-only clears the cache once it has run; MCP action
+        tools do so only for actions that are not read-only.
+        """
+        if self._tool_cache is None:
+            return tools
+
+        cache = self._tool_cache
+
+        def cached(tool):
+            func = tool.func
+
+            @wraps(func)
+            def run(**kwargs):
+                key = (tool.name, json.dumps(kwargs, sort_keys=True, default=str))
+                result = cache.get(key)
+                if result is not None:
+                    self.tool_cache_hits += 1
+                    logger.info("  Tool cache hit: %s (%d hits)", tool.name, self.tool_cache_hits)
+                    return result
+                result = func(**kwargs)
+                cache.set(key, result)
+                return result
+
+            return tool.model_copy(update={"func": run})
+
+        def invalidating(tool):
+            func = tool.func
+            mcp = _MCP_ACTION_TOOL_RE.fullmatch(tool.name) is not None
+
+            def invalidate(kwargs):
+                if not (mcp and READ_ONLY_ACTION_RE.match(kwargs.get("action", ""))):
+                    cache.discard_if(lambda key: True)
+
+            @wraps(func)
+            def run(**kwargs):
+                try:
+                    return func(**kwargs)
+                finally:
+                    invalidate(kwargs)
+
+            update = {"func": run}
+            if tool.coroutine is not None:
+                coroutine = tool.coroutine
+
+                @wraps(coroutine)
+                async def arun(**kwargs):
+                    try:
+                        return await coroutine(**kwargs)
+                    finally:
+                        invalidate(kwargs)
+
+                update["coroutine"] = arun
+            return tool.model_copy(update=update)
+
+        wrapped = []
+        for tool in tools:
+            if getattr(tool, "func", None) is None:
+                wrapped.append(tool)
+            elif _CACHEABLE_TOOL_RE.fullmatch(tool.name):
+                wrapped.append(cached(tool))
+            elif _READ_ONLY_TOOL_RE.fullmatch(tool.name):
+                wrapped.append(tool)
+            else:
+                wrapped.append(invalidating(tool))
+        return wrapped
+
+    def _with_keepalive(self, tools: list) -> list:
+        """
+        With extend_on_progress, wrap tools so the sandbox is extended before each call.
+
+        The extension covers at least the call's ``timeout`` argument, or the
+        tool's default from _TOOL_TIMEOUTS, so a long install or MCP call
+        cannot outlive the sandbox.
+        """
+        if not self.extend_on_progress:
+            return tools
+
+        def keepalive(tool):
+            default = _TOOL_TIMEOUTS.get(tool.name, 0)
+            func = tool.func
+
+            @wraps(func)
+            def run(**kwargs):
+                self._keep_sandbox_alive(kwargs.get("timeout") or default)
+                return func(**kwargs)
+
+            update = {"func": run}
+            if tool.coroutine is not None:
+                coroutine = tool.coroutine
+
+                @wraps(coroutine)
+                async def arun(**kwargs):
+                    self._keep_sandbox_alive(kwargs.get("timeout") or default)
+                    return await coroutine(**kwargs)
+
+                update["coroutine"] = arun
+            return tool.model_copy(update=update)
+
+        return [
+            tool if getattr(tool, "func", None) is None else keepalive(tool)
+            for tool in tools
+        ]
+
+    def _keep_sandbox_alive(self, min_seconds: float = 0):
+        """
+        With extend_on_progress, reset the sandbox timeout once a third of it has elapsed.
+
+        ``min_seconds`` is how long the caller needs the sandbox; when less
+        than that remains the timeout is extended to cover it.
+        """
+        if not self.extend_on_progress or self.sandbox is None:
+            return
+        now = time.monotonic()
+        remaining = self._sandbox_deadline - now
+        if remaining > self.sandbox_timeout * 2 / 3 and remaining > min_seconds:
+            return
+        window = max(self.sandbox_timeout, int(min_seconds))
+        try:
+            self.sandbox.set_timeout(window)
+            self._sandbox_deadline = now + window
+        except Exception as e:
+            logger.warning("  Warning: could not extend sandbox timeout: %s", e)
+
+    def _agent_input(self, state: AgentState):
+        """
+        Prepare an agent step.
+
+        Returns:
+            (messages to send to the model, None), or (None, final state
+            update) once the iteration limit is reached
+        """
+        self._keep_sandbox_alive()
         iteration_count = state.get("iteration_count", 0)
 
         # Check iteration limit
         if iteration_count >= self.max_iterations:
-            return {
+            return None, {
                 "messages": [AIMessage(content="Maximum iterations reached. Task may be too complex or unclear.")],
                 "iteration_count": iteration_count + 1,
             }
 
-        # Add system message if this is the first iteration
-        if iteration_count == 0:
-            messages = [SystemMessage(content=self.system_prompt)] + list(messages)
-
-        # Call model
-        response = self.model_with_tools.invoke(messages)
-
+        return _trim_to_token_budget(state["messages"], MAX_CONTEXT_TOKENS), None
+
+    @staticmethod
+    def _agent_output(state: AgentState, response) -> AgentState:
+        """State update for a completed model response (accumulated stream chunks)."""
+        usage = response.usage_metadata
+        if usage:
+            logger.debug(
+                "  Model usage: %d input tokens (%d read from prompt cache)",
+                usage["input_tokens"],
+                usage.get("input_token_details", {}).get("cache_read", 0),
+            )
         return {
-            "messages": [response],
-            "iteration_count": iteration_count + 1,
+            "messages": [message_chunk_to_message(response)],
+            "iteration_count": state.get("iteration_count", 0) + 1,
         }
 
+    def _agent_node(self, state: AgentState) -> AgentState:
+        """Agent reasoning node - decides what to do next."""
+        messages, update = self._agent_input(state)
+        if update is not None:
+            return update
+
+        # Stream the completion so tokens reach stream listeners as they
+        # arrive, then merge the chunks into a single message
+        response = None
+        for chunk in self.model_with_tools.stream(messages):
+            response = chunk if response is None else response + chunk
+
+        return self._agent_output(state, response)
+
+    async def _aagent_node(self, state: AgentState) -> AgentState:
+        """Async agent node, used by ainvoke and the async streaming methods."""
+        messages, update = self._agent_input(state)
+        if update is not None:
+            return update
+
+        response = None
+        async for chunk in self.model_with_tools.astream(messages):
+            response = chunk if response is None else response + chunk
+
+        return self._agent_output(state, response)
+
     def _should_continue(self, state: AgentState) -> Literal["continue", "end"]:
-        """Determine whether to continue to tools or end."""
-        messages = state["messages"]
-        last_message = messages[-1]
+        """Determine whether to continue to tools (the last message requested tool calls) or end."""
+        return "continue" if getattr(state["messages"][-1], "tool_calls", None) else "end"
 
-        # If there are tool calls, continue to tools
-        if hasattr(last_message, "tool_calls") and last_message.tool_calls:
-            return "continue"
+    @staticmethod
+    def _thread_config(thread_id: Optional[str]) -> dict:
+        """Checkpointer config for a conversation thread (a throwaway one if None)."""
+        return {"configurable": {"thread_id": thread_id or f"task-{uuid.uuid4().hex}"}}
 
-        # Otherwise end
-        return "end"
+    def _end_thread(self, config: dict, thread_id: Optional[str]):
+        """Drop the checkpoints of a throwaway thread once its task is done."""
+        if thread_id is None:
+            self.checkpointer.delete_thread(config["configurable"]["thread_id"])
 
-    def invoke(self, task: str) -> dict:
+    def invoke(self, task: str, thread_id: Optional[str] = None) -> dict:
         """
         Execute a task using the agent.
 
         Args:
             task: The task description
+            thread_id: Conversation thread to continue; its earlier messages are
+                restored from the checkpointer. By default the task runs on a
+                fresh thread that is discarded afterwards.
 
         Returns:
             Dictionary containing the agent's response and metadata
         """
-        print(f"\nTask: {task}\n")
-        print("=" * 80)
+        logger.info("\nTask: %s\n", task)
+        logger.info("=" * 80)
 
         # Initial state
         initial_state = {
@@ -282,18 +816,23 @@ Remember: You're in a secure E2B sandbox, so you can safely execute code and exp
             "iteration_count": 0,
         }
 
-        # Run graph
-        final_state = self.graph.invoke(initial_state)
+        # Run graph, reporting each step as it completes
+        config = self._thread_config(thread_id)
+        try:
+            self._stream_graph(initial_state, config)
+            final_state = self.graph.get_state(config).values
+        finally:
+            self._end_thread(config, thread_id)
 
-        print("=" * 80)
-        print("\nTask completed\n")
+        logger.info("=" * 80)
+        logger.info("\nTask completed\n")
 
         return final_state
 
-    async def ainvoke(self, task: str) -> dict:
+    async def ainvoke(self, task: str, thread_id: Optional[str] = None) -> dict:
         """Async version of invoke."""
-        print(f"\nTask: {task}\n")
-        print("=" * 80)
+        logger.info("\nTask: %s\n", task)
+        logger.info("=" * 80)
 
         initial_state = {
             "messages": [HumanMessage(content=task)],
@@ -302,25 +841,82 @@ Remember: You're in a secure E2B sandbox, so you can safely execute code and exp
             "iteration_count": 0,
         }
 
-        final_state = await self.graph.ainvoke(initial_state)
+        config = self._thread_config(thread_id)
+        try:
+            final_state = await self.graph.ainvoke(initial_state, config)
+        finally:
+            self._end_thread(config, thread_id)
 
-        print("=" * 80)
-        print("\nTask completed\n")
+        logger.info("=" * 80)
+        logger.info("\nTask completed\n")
 
         return final_state
 
+    async def astream_messages(self, task: str, thread_id: Optional[str] = None):
+        """
+        Run a task asynchronously, yielding each new message as it is produced.
+
+        Only the messages added by each graph step are yielded, so long runs
+        can be printed incrementally instead of after the whole transcript is built.
+        """
+        logger.info("\nTask: %s\n", task)
+        logger.info("=" * 80)
+
+        initial_state = {
+            "messages": [HumanMessage(content=task)],
+            "plan": None,
+            "next_action": None,
+            "iteration_count": 0,
+        }
+
+        config = self._thread_config(thread_id)
+        try:
+            async for update in self.graph.astream(initial_state, config, stream_mode="updates"):
+                for node_update in update.values():
+                    for message in (node_update or {}).get("messages", ()):
+                        yield message
+        finally:
+            self._end_thread(config, thread_id)
+
+        logger.info("=" * 80)
+        logger.info("\nTask completed\n")
+
+    async def astream(self, task: str, thread_id: Optional[str] = None):
+        """
+        Run a task asynchronously, yielding model tokens and tool results as events.
+
+        Yields LangGraph v2 stream events: ``on_chat_model_stream`` for each
+        token chunk (``event["data"]["chunk"]``) and ``on_tool_end`` for each
+        finished tool call (``event["data"]["output"]``). Suited to SSE or
+        WebSocket handlers, since nothing blocks the caller's event loop.
+        """
+        initial_state = {
+            "messages": [HumanMessage(content=task)],
+            "plan": None,
+            "next_action": None,
+            "iteration_count": 0,
+        }
+
+        config = self._thread_config(thread_id)
+        try:
+            async for event in self.graph.astream_events(initial_state, config, version="v2"):
+                if event["event"] in _STREAM_EVENTS:
+                    yield event
+        finally:
+            self._end_thread(config, thread_id)
+
     def chat(self):
         """Start an interactive chat session."""
         print("\nStarting interactive chat with Deep Agent (LangGraph)")
         print("Type 'exit' or 'quit' to end the session\n")
         print("=" * 80)
 
-        conversation_state = {
-            "messages": [],
-            "plan": None,
-            "next_action": None,
-            "iteration_count": 0,
-        }
+        # Earlier turns live in the checkpointer; each turn only sends the new
+        # message (plus removals for turns that fell out of the window). The
+        # message IDs of the turns in the window are tracked here, so trimming
+        # never has to load the transcript back from the checkpointer.
+        config = self._thread_config(f"chat-{uuid.uuid4().hex}")
+        turns: deque[list[str]] = deque()
 
         while True:
             try:
@@ -333,23 +929,24 @@ Remember: You're in a secure E2B sandbox, so you can safely execute code and exp
                 if not user_input:
                     continue
 
-                # Add user message
-                conversation_state["messages"].append(HumanMessage(content=user_input))
-                conversation_state["iteration_count"] = 0  # Reset for new turn
-
-                # Run graph
-                result_state = self.graph.invoke(conversation_state)
-
-                # Extract assistant response
-                if result_state["messages"]:
-                    last_message = result_state["messages"][-1]
-                    if isinstance(last_message, AIMessage):
-                        print(f"\nAgent: {last_message.content}\n")
-                    else:
-                        print(f"\nAgent: {last_message}\n")
-
-                # Update conversation state
-                conversation_state = result_state
+                # Add user message, dropping turns beyond the rolling window
+                message = HumanMessage(content=user_input, id=str(uuid.uuid4()))
+                removals = []
+                while len(turns) >= MAX_CHAT_TURNS:
+                    removals.extend(RemoveMessage(id=message_id) for message_id in turns.popleft())
+                update = {
+                    "messages": removals + [message],
+                    "iteration_count": 0,  # Reset for new turn
+                }
+
+                # Run graph, printing assistant replies as they are produced.
+                # A failed turn is still recorded, so its messages are trimmed
+                # from the checkpointer like any other
+                added = []
+                try:
+                    self._stream_graph(update, config, echo=True, added=added)
+                finally:
+                    turns.append([message.id, *(m.id for m in added if m.id)])
 
             except KeyboardInterrupt:
                 print("\n\nChat interrupted. Goodbye!")
@@ -357,7 +954,43 @@ Remember: You're in a secure E2B sandbox, so you can safely execute code and exp
             except Exception as e:
                 print(f"\nError: {str(e)}\n")
 
-    def stream(self, task: str):
+        self.checkpointer.delete_thread(config["configurable"]["thread_id"])
+
+    def _stream_graph(
+        self, state: dict, config: dict, echo: bool = False, added: Optional[list] = None
+    ) -> list[BaseMessage]:
+        """
+        Run the graph in streaming mode and return the messages it added.
+
+        Tool calls are reported as soon as the model requests them; with
+        ``echo`` the assistant's replies are printed token by token as the
+        model produces them. Messages are collected into ``added`` when given,
+        so a caller still sees what was added if the run raises part-way.
+        """
+        added = [] if added is None else added
+        replying = False  # part-way through printing a reply
+        for mode, data in self._graph_stream(state, config, stream_mode=["updates", "messages"]):
+            if mode == "messages":
+                chunk, metadata = data
+                if echo and metadata.get("langgraph_node") == "agent" and chunk.text:
+                    if not replying:
+                        print("\nAgent: ", end="")
+                        replying = True
+                    print(chunk.text, end="", flush=True)
+                continue
+
+            if replying:
+                print("\n")
+                replying = False
+            for node_update in data.values():
+                for message in (node_update or {}).get("messages", ()):
+                    added.append(message)
+                    if isinstance(message, AIMessage):
+                        for tool_call in message.tool_calls:
+                            logger.info("  -> %s", tool_call["name"])
+        return added
+
+    def stream(self, task: str, thread_id: Optional[str] = None):
         """Stream the agent's execution (returns generator)."""
         initial_state = {
             "messages": [HumanMessage(content=task)],
@@ -366,18 +999,56 @@ Remember: You're in a secure E2B sandbox, so you can safely execute code and exp
             "iteration_count": 0,
         }
 
-        for state in self.graph.stream(initial_state):
-            yield state
+        config = self._thread_config(thread_id)
+        try:
+            for state in self.graph.stream(initial_state, config):
+                yield state
+        finally:
+            self._end_thread(config, thread_id)
+
+    def release(self):
+        """Return the sandbox to the process-wide pool (or, without reuse_sandbox, kill it)."""
+        sandbox = self.sandbox
+        if sandbox is None or self._is_borrowed(sandbox):
+            self.sandbox = self._run_cmd = None
+            return
+        if not self.reuse_sandbox:
+            if self.keep_sandbox:
+                self.sandbox = self._run_cmd = None
+                logger.info("  Sandbox left to expire after its timeout")
+            else:
+                # Killed now rather than billed until its timeout runs out
+                self._kill_sandbox()
+                logger.info("  Sandbox killed (ID: %s)", sandbox.sandbox_id)
+            return
+        self.sandbox = self._run_cmd = None
+        with _SANDBOX_POOL_LOCK:
+            _SANDBOX_POOL.setdefault(self._pool_key, []).append(sandbox)
+        logger.info("  Sandbox returned to pool (ID: %s)", sandbox.sandbox_id)
 
     def close(self):
         """Clean up resources."""
         if self.sandbox:
-            print("\nClosing E2B sandbox...")
-            print("  Resources cleaned up")
+            logger.info("\nClosing E2B sandbox...")
+            self.release()
+            logger.info("  Resources cleaned up")
         if self.mcp_client:
-            print("  Releasing MCP client")
+            logger.info("  Releasing MCP client")
             self.mcp_client = None
 
+    def _is_borrowed(self, sandbox: Sandbox) -> bool:
+        """Whether the sandbox was passed in by the caller, who owns its lifetime."""
+        return sandbox is self._external_sandbox
+
+    def _kill_sandbox(self):
+        """Kill the sandbox, ignoring errors (used on failed initialization)."""
+        sandbox, self.sandbox = self.sandbox, None
+        self._run_cmd = None
+        if sandbox is not None and not self._is_borrowed(sandbox):
+            drop_mcp_session(sandbox.sandbox_id)
+            with suppress(Exception):
+                sandbox.kill()
+
     def __enter__(self):
         """Context manager entry."""
         return self
@@ -386,39 +1057,68 @@ Remember: You're in a secure E2B sandbox, so you can safely execute code and exp
         """Context manager exit."""
         self.close()
 
+    async def aclose(self):
+        """Async version of close; the blocking sandbox calls run in a worker thread."""
+        await asyncio.to_thread(self.close)
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.aclose()
+
     def _run_sandbox_command(self, command: str, timeout: int = 60):
         """Run a sandbox command with error handling."""
-        if not self.sandbox:
+        run_cmd = self._run_cmd
+        if run_cmd is None:
             raise RuntimeError("Sandbox is not initialized")
 
         try:
-            return self.sandbox.commands.run(command, timeout=timeout)
+            return run_cmd(command, timeout=timeout)
         except AuthenticationException as exc:
             raise RuntimeError(
                 "E2B authentication failed while executing a sandbox command."
             ) from exc
 
-    def _verify_sandbox_command_channel(self):
-        """Verify sandbox command endpoint works."""
-        print("  Verifying sandbox command channel...")
-        result = self._run_sandbox_command("echo E2B_SANDBOX_OK")
-
-        if result.exit_code != 0:
-            raise RuntimeError("Sandbox command verification failed")
-        print("  Sandbox command channel verified")
-
-    def _configure_mcp_gateway(self, mcp_url: str, mcp_token: str):
-        """Register sandbox MCP gateway with Claude CLI."""
-        print("  Configuring Claude CLI with MCP gateway...")
-        result = self._run_sandbox_command(
-            f'claude mcp add --transport http e2b-mcp-gateway {mcp_url} --header "Authorization: Bearer {mcp_token}"',
-            timeout=30,
-        )
+    def _bootstrap_sandbox(self, mcp_url: Optional[str] = None, mcp_token: Optional[str] = None):
+        """
+        Register the MCP gateway with Claude CLI and, when ``verify_channel`` is
+        set, verify the sandbox command channel in the same command round trip.
 
-        if result.exit_code == 0:
-            print("  Claude CLI configured with MCP gateway")
-        else:
-            print(f"  Warning: MCP gateway setup had issues: {result.stderr}")
+        Sandbox creation already authenticated, so with no gateway and no
+        verification requested this makes no call at all.
+        """
+        commands = []
+        if self.verify_channel:
+            logger.info("  Verifying sandbox command channel...")
+            commands.append(f"echo {_SANDBOX_SENTINEL}")
+        if mcp_url:
+            logger.info("  Configuring Claude CLI with MCP gateway...")
+            commands.append(
+                f'claude mcp add --transport http e2b-mcp-gateway {mcp_url}'
+                f' --header "Authorization: Bearer {mcp_token}"'
+            )
+        if not commands:
+            return
+
+        try:
+            result = self._run_sandbox_command(" && ".join(commands), timeout=60)
+        except CommandExitException as exc:
+            # Newer E2B SDKs raise on non-zero exit; the exception carries the output
+            result = exc
+
+        if self.verify_channel:
+            if not (result.stdout or "").startswith(_SANDBOX_SENTINEL):
+                raise RuntimeError("Sandbox command verification failed")
+            logger.info("  Sandbox command channel verified")
+
+        if mcp_url:
+            if result.exit_code == 0:
+                logger.info("  Claude CLI configured with MCP gateway")
+            else:
+                logger.warning("  Warning: MCP gateway setup had issues: %s", result.stderr)
 
 
 def main():
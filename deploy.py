@@ -6,12 +6,154 @@ It can run as a persistent service, handling tasks from a queue or API.
 """
 
 import os
+import struct
 import time
-import json
-from typing import Optional, Dict, Any
+from datetime import date
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
+import httpx
+import orjson
+import ormsgpack
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+from e2b.exceptions import SandboxException
 from deep_agent import DeepAgentE2B
 
+# Task queue: a stream of msgpack-encoded task dicts, each prefixed with its
+# 4-byte big-endian length. Producers append a frame; the server records how
+# far it has consumed in a sidecar cursor file instead of rewriting the queue.
+DEFAULT_QUEUE_FILE = "/tmp/deep_agent_queue.msgpack"
+
+# Queue location and format used before the msgpack queue; migrated on startup
+LEGACY_QUEUE_FILE = "/tmp/deep_agent_queue.json"
+
+_FRAME_HEADER = struct.Struct(">I")
+
+# How often an idle server stats the queue file for new frames (seconds)
+_QUEUE_WATCH_INTERVAL = 0.25
+
+
+def _is_sandbox_error(exc: BaseException) -> bool:
+    """
+    True if exc, or an exception it was raised from, is a sandbox failure.
+
+    That is an E2B SandboxException, or a transport error on a request to the
+    E2B domain; these mean the sandbox (or its connection) is unusable, so a
+    fresh agent may succeed where the warm one failed. Transport errors from
+    other clients (e.g. the Anthropic API) do not count.
+    """
+    domain = os.getenv("E2B_DOMAIN") or "e2b.app"
+    while exc is not None:
+        if isinstance(exc, SandboxException):
+            return True
+        if isinstance(exc, httpx.TransportError):
+            try:
+                host = exc.request.url.host
+            except RuntimeError:
+                host = ""
+            if host == domain or host.endswith("." + domain):
+                return True
+        exc = exc.__cause__
+    return False
+
+
+def _atomic_write(path: Path, data: bytes):
+    """
+    Replace path's contents atomically: write a sibling temp file, then rename.
+
+    A crash leaves either the old or the new file, never a truncated one. No
+    fsync: the queue lives in /tmp and is not expected to survive a reboot.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _encode_frames(tasks: List[Dict[str, Any]]) -> bytes:
+    """Encode tasks as length-prefixed msgpack frames."""
+    frames = []
+    for task in tasks:
+        buf = ormsgpack.packb(task)
+        frames.append(_FRAME_HEADER.pack(len(buf)))
+        frames.append(buf)
+    return b"".join(frames)
+
+
+@contextmanager
+def _queue_lock(queue_file: Path):
+    """
+    Hold the queue's exclusive lock, shared by producers and the compactor.
+
+    The lock lives in a sidecar file because compaction replaces the queue
+    file itself: a producer locking the old inode would append to a file that
+    is no longer linked.
+    """
+    with open(queue_file.with_name(queue_file.name + ".lock"), "ab") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+            return
+        # msvcrt locks a byte range from the current position, so lock byte 0
+        lock.seek(0)
+        msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _append_tasks(queue_file: Path, tasks: List[Dict[str, Any]]):
+    """Append tasks to the queue without touching the frames already written."""
+    with _queue_lock(queue_file), open(queue_file, "ab") as f:
+        f.write(_encode_frames(tasks))
+
+
+def _read_frames(queue_file: Path, offset: int = 0) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Decode the frames stored after ``offset``.
+
+    Returns:
+        (end offset, task) pairs; a trailing partial frame (a producer still
+        mid-append) is left for the next read
+    """
+    try:
+        with open(queue_file, "rb") as f:
+            f.seek(offset)
+            data = memoryview(f.read())
+    except FileNotFoundError:
+        return []
+
+    frames = []
+    pos, size, header = 0, len(data), _FRAME_HEADER.size
+    while pos + header <= size:
+        (length,) = _FRAME_HEADER.unpack_from(data, pos)
+        end = pos + header + length
+        if end > size:
+            break
+        frames.append((offset + end, ormsgpack.unpackb(data[pos + header:end])))
+        pos = end
+    return frames
+
+
+def _migrate_legacy_queue(queue_file: Path, legacy_file: Path = Path(LEGACY_QUEUE_FILE)):
+    """Move tasks from a JSON queue file into the framed queue (one shot)."""
+    if legacy_file == queue_file or not legacy_file.exists():
+        return
+    try:
+        tasks = orjson.loads(legacy_file.read_bytes())
+    except Exception as e:
+        print(f"Error migrating legacy task queue: {str(e)}")
+        return
+    if tasks:
+        _append_tasks(queue_file, tasks)
+        print(f"Migrated {len(tasks)} task(s) from {legacy_file}")
+    legacy_file.unlink()
+
 
 class DeepAgentServer:
     """
@@ -27,38 +169,118 @@ class DeepAgentServer:
     def __init__(
         self,
         log_dir: str = "/tmp/deep_agent_logs",
-        task_queue_file: str = "/tmp/deep_agent_queue.json",
+        task_queue_file: str = DEFAULT_QUEUE_FILE,
         max_retries: int = 3,
+        idle_ttl: float = 300,
     ):
         """
         Initialize the Deep Agent server.
 
         Args:
             log_dir: Directory for storing logs
-            task_queue_file: Path to task queue file
+            task_queue_file: Path to the framed msgpack task queue file
             max_retries: Maximum retry attempts for failed tasks
+            idle_ttl: Seconds the warm agent may sit unused before it is closed;
+                the next task reinitializes it
         """
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
 
         self.task_queue_file = Path(task_queue_file)
+        self.cursor_file = self.task_queue_file.with_name(self.task_queue_file.name + ".cursor")
         self.max_retries = max_retries
+        self.idle_ttl = idle_ttl
         self.agent: Optional[DeepAgentE2B] = None
+        self._last_used = time.monotonic()
+
+        # Task records go to one append-only NDJSON file per day, kept open
+        self._log_fp = None
+        self._log_date: Optional[date] = None
+        self._log_path: Optional[Path] = None
 
         print(f"Log directory: {self.log_dir}")
         print(f"Task queue file: {self.task_queue_file}")
 
+        _migrate_legacy_queue(self.task_queue_file)
+
     def initialize_agent(self):
         """Initialize or reinitialize the agent."""
         print("Initializing agent...")
         try:
-            self.agent = DeepAgentE2B()
+            # Not pooled: closing the agent (idle reaper, sandbox error) must
+            # stop its sandbox, not park it for the next initialize_agent()
+            self.agent = DeepAgentE2B(reuse_sandbox=False)
             print("Agent initialized successfully")
             return True
         except Exception as e:
             print(f"Failed to initialize agent: {str(e)}")
             return False
 
+    def _log_task(self, record: Dict[str, Any]) -> Tuple[Path, int]:
+        """
+        Append one task record to today's NDJSON log.
+
+        Returns:
+            Log file path and the byte offset the record starts at
+        """
+        today = date.today()
+        if today != self._log_date:
+            self._close_log()
+            self._log_path = self.log_dir / f"tasks-{today.isoformat()}.ndjson"
+            self._log_fp = open(self._log_path, "ab", buffering=1 << 16)
+            self._log_date = today
+
+        offset = self._log_fp.tell()
+        self._log_fp.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE, default=str))
+        self._log_fp.flush()
+        return self._log_path, offset
+
+    def _close_log(self):
+        """Close the current log file, if open."""
+        if self._log_fp:
+            self._log_fp.close()
+            self._log_fp = None
+            self._log_date = None
+
+    def close(self):
+        """Close the warm agent and the task log."""
+        self.close_agent()
+        self._close_log()
+
+    def close_agent(self):
+        """Close the warm agent, if any; the next task creates a new one."""
+        agent, self.agent = self.agent, None
+        if agent:
+            agent.close()
+
+    def _reap_idle_agent(self):
+        """Close the agent once it has been unused for longer than idle_ttl."""
+        if self.agent and time.monotonic() - self._last_used > self.idle_ttl:
+            print(f"Agent idle for over {self.idle_ttl}s, closing it")
+            self.close_agent()
+
+    def _invoke(self, description: str):
+        """
+        Run a task on the warm agent, creating it if needed.
+
+        If the sandbox fails underneath the agent (expired, lost connection),
+        the agent is rebuilt once and the task retried on the fresh sandbox.
+        """
+        if not self.agent and not self.initialize_agent():
+            raise Exception("Failed to initialize agent")
+        try:
+            return self.agent.invoke(description)
+        except Exception as e:
+            if not _is_sandbox_error(e):
+                raise
+            print(f"Sandbox error ({str(e)}), reinitializing agent...")
+            self.close_agent()
+            if not self.initialize_agent():
+                raise
+            return self.agent.invoke(description)
+        finally:
+            self._last_used = time.monotonic()
+
     def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process a single task.
@@ -77,39 +299,30 @@ class DeepAgentServer:
         print(f"Description: {description}")
         print("=" * 80)
 
-        log_file = self.log_dir / f"task_{task_id}_{int(time.time())}.log"
-
         try:
-            # Ensure agent is initialized
-            if not self.agent:
-                if not self.initialize_agent():
-                    raise Exception("Failed to initialize agent")
-
-            # Execute task
-            result = self.agent.invoke(description)
+            # Execute task on the warm agent
+            result = self._invoke(description)
 
             # Log results
-            with open(log_file, "w") as f:
-                json.dump(
-                    {
-                        "task_id": task_id,
-                        "description": description,
-                        "status": "success",
-                        "result": str(result),
-                        "timestamp": time.time(),
-                    },
-                    f,
-                    indent=2,
-                )
+            log_file, log_offset = self._log_task(
+                {
+                    "task_id": task_id,
+                    "description": description,
+                    "status": "success",
+                    "result": str(result),
+                    "timestamp": time.time(),
+                },
+            )
 
             print(f"Task {task_id} completed successfully")
-            print(f"Log saved to: {log_file}")
+            print(f"Log saved to: {log_file} (offset {log_offset})")
 
             return {
                 "task_id": task_id,
                 "status": "success",
                 "result": result,
                 "log_file": str(log_file),
+                "log_offset": log_offset,
             }
 
         except Exception as e:
@@ -117,52 +330,109 @@ class DeepAgentServer:
             print(f"Task {task_id} failed: {error_msg}")
 
             # Log error
-            with open(log_file, "w") as f:
-                json.dump(
-                    {
-                        "task_id": task_id,
-                        "description": description,
-                        "status": "error",
-                        "error": error_msg,
-                        "timestamp": time.time(),
-                    },
-                    f,
-                    indent=2,
-                )
+            log_file, log_offset = self._log_task(
+                {
+                    "task_id": task_id,
+                    "description": description,
+                    "status": "error",
+                    "error": error_msg,
+                    "timestamp": time.time(),
+                },
+            )
 
             return {
                 "task_id": task_id,
                 "status": "error",
                 "error": error_msg,
                 "log_file": str(log_file),
+                "log_offset": log_offset,
             }
 
-    def load_task_queue(self) -> list:
-        """Load tasks from the queue file."""
-        if not self.task_queue_file.exists():
-            return []
-
+    def _read_cursor(self) -> int:
+        """Byte offset of the first unconsumed frame."""
+        try:
+            offset = int(self.cursor_file.read_text())
+            size = self.task_queue_file.stat().st_size
+        except (FileNotFoundError, ValueError):
+            return 0
+        # A cursor past the end is left by a crash between compacting the
+        # queue and resetting the cursor; it points into a previous file
+        return offset if offset <= size else 0
+
+    def _write_cursor(self, offset: int):
+        """Persist the consumer offset atomically."""
+        _atomic_write(self.cursor_file, str(offset).encode())
+
+    def _pending_frames(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """Unconsumed (end offset, task) pairs."""
         try:
-            with open(self.task_queue_file, "r") as f:
-                return json.load(f)
+            return _read_frames(self.task_queue_file, self._read_cursor())
         except Exception as e:
             print(f"Error loading task queue: {str(e)}")
             return []
 
+    def load_task_queue(self) -> list:
+        """Load pending tasks from the queue file."""
+        return [task for _, task in self._pending_frames()]
+
     def save_task_queue(self, tasks: list):
-        """Save tasks to the queue file."""
+        """Replace the queue contents with ``tasks`` and reset the cursor."""
+        with _queue_lock(self.task_queue_file):
+            self._replace_queue(tasks)
+
+    def _replace_queue(self, tasks: list):
+        """save_task_queue without taking the queue lock; the caller holds it."""
         try:
-            with open(self.task_queue_file, "w") as f:
-                json.dump(tasks, f, indent=2)
+            _atomic_write(self.task_queue_file, _encode_frames(tasks))
+            self._write_cursor(0)
         except Exception as e:
             print(f"Error saving task queue: {str(e)}")
 
+    def _consume(self, end: int):
+        """Mark the queue consumed up to ``end``; compact once fully drained."""
+        self._write_cursor(end)
+        try:
+            drained = end >= self.task_queue_file.stat().st_size
+        except FileNotFoundError:
+            drained = True
+        if drained:
+            # Producers are held off while the queue is rewritten; frames
+            # appended since the size check are re-read and carried over
+            with _queue_lock(self.task_queue_file):
+                self._replace_queue([task for _, task in _read_frames(self.task_queue_file, end)])
+
+    def _queue_signature(self) -> Optional[Tuple[int, int]]:
+        """(size, mtime) of the queue file, or None if it does not exist."""
+        try:
+            st = os.stat(self.task_queue_file)
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _wait_for_queue_change(self, signature: Optional[Tuple[int, int]], timeout: float) -> bool:
+        """
+        Block until the queue file differs from ``signature`` or ``timeout`` elapses.
+
+        A stat call is all an idle check costs, so new tasks are picked up
+        within _QUEUE_WATCH_INTERVAL instead of a full poll interval.
+
+        Returns:
+            True if the queue changed, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(_QUEUE_WATCH_INTERVAL)
+            if self._queue_signature() != signature:
+                return True
+        return False
+
     def run_server(self, poll_interval: int = 10):
         """
         Run the server in continuous mode.
 
         Args:
-            poll_interval: Seconds between queue checks
+            poll_interval: Maximum seconds between full queue checks while idle;
+                appended tasks wake the server sooner
         """
         print("\nStarting Deep Agent Server")
         print(f"Poll interval: {poll_interval} seconds")
@@ -170,54 +440,48 @@ class DeepAgentServer:
 
         try:
             while True:
-                # Load tasks from queue
-                tasks = self.load_task_queue()
-
-                if tasks:
-                    print(f"Found {len(tasks)} task(s) in queue")
+                # Snapshot the file before reading so an append that lands
+                # while we read still registers as a change below
+                signature = self._queue_signature()
 
-                    # Process first task
-                    task = tasks.pop(0)
-                    self.process_task(task)
+                # Load unconsumed tasks from queue
+                pending = self._pending_frames()
 
-                    # Save updated queue
-                    self.save_task_queue(tasks)
+                if pending:
+                    print(f"Found {len(pending)} task(s) in queue")
 
-                    # Brief pause between tasks
-                    time.sleep(2)
+                    # Drain the queue, advancing the cursor past each task
+                    for end, task in pending:
+                        self.process_task(task)
+                        self._consume(end)
                 else:
-                    # No tasks, wait before checking again
-                    print(f"No tasks in queue. Checking again in {poll_interval}s...")
-                    time.sleep(poll_interval)
+                    # No tasks, wait for the queue file to change
+                    print(f"No tasks in queue. Waiting up to {poll_interval}s for new tasks...")
+                    self._wait_for_queue_change(signature, poll_interval)
+                    self._reap_idle_agent()
 
         except KeyboardInterrupt:
             print("\n\nServer stopped by user")
         except Exception as e:
             print(f"\n\nServer error: {str(e)}")
         finally:
-            if self.agent:
-                self.agent.close()
+            self.close()
 
     def run_single_task(self, description: str, task_id: Optional[str] = None):
         """
-        Run a single task immediately.
+        Run a single task immediately on the server's warm agent.
+
+        The agent stays open for further tasks; call close() when done.
 
         Args:
             description: Task description
             task_id: Optional task ID (auto-generated if not provided)
         """
         if not task_id:
-            task_id = f"task_{int(time.time())}"
+            task_id = f"task_{time.time_ns()}"
 
         task = {"id": task_id, "description": description}
-
-        try:
-            self.initialize_agent()
-            result = self.process_task(task)
-            return result
-        finally:
-            if self.agent:
-                self.agent.close()
+        return self.process_task(task)
 
 
 def deploy_server():
@@ -229,42 +493,37 @@ def deploy_server():
 def deploy_single_task(task_description: str):
     """Deploy a single task and exit."""
     server = DeepAgentServer()
-    result = server.run_single_task(task_description)
+    try:
+        result = server.run_single_task(task_description)
+    finally:
+        server.close()
 
     print("\n" + "=" * 80)
     print("TASK RESULT")
     print("=" * 80)
-    print(json.dumps(result, indent=2))
+    print(orjson.dumps(result, option=orjson.OPT_INDENT_2, default=str).decode())
 
 
 def add_task_to_queue(task_description: str, task_id: Optional[str] = None):
     """Add a task to the queue for later processing."""
-    queue_file = Path("/tmp/deep_agent_queue.json")
+    queue_file = Path(DEFAULT_QUEUE_FILE)
+    _migrate_legacy_queue(queue_file)
 
-    # Load existing queue
-    if queue_file.exists():
-        with open(queue_file, "r") as f:
-            tasks = json.load(f)
-    else:
-        tasks = []
-
-    # Add new task
+    # Add new task as a single appended frame
     if not task_id:
-        task_id = f"task_{int(time.time())}"
+        task_id = f"task_{time.time_ns()}"
 
-    tasks.append({"id": task_id, "description": task_description})
-
-    # Save queue
-    with open(queue_file, "w") as f:
-        json.dump(tasks, f, indent=2)
+    _append_tasks(queue_file, [{"id": task_id, "description": task_description}])
 
     print(f"Task {task_id} added to queue")
-    print(f"Queue now contains {len(tasks)} task(s)")
 
 
 if __name__ == "__main__":
+    import logging
     import sys
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     if len(sys.argv) < 2:
         print("Usage:")
         print("  python deploy.py server              # Run in server mode")
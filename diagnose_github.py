@@ -1,13 +1,30 @@
 """Diagnostic script to check GitHub MCP integration and token scopes."""
+import logging
 import os
+import sys
 from dotenv import load_dotenv
-from deep_agent import DeepAgentE2B
+from deep_agent import DeepAgentE2B, mask_secret
 
 load_dotenv()
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
-print("=" * 60)
+# Reconfigure the console once instead of transcoding every message
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+if sys.platform == "win32":
+    os.system("")  # enable VT processing on Windows consoles
+
+BAR = "=" * 60
+
+# Known GitHub personal access token prefixes
+TOKEN_FORMATS = (
+    ("ghp_", "Classic Personal Access Token (ghp_)"),
+    ("github_pat_", "Fine-grained Personal Access Token (github_pat_)"),
+)
+
+print(BAR)
 print("GitHub MCP Integration Diagnostic")
-print("=" * 60)
+print(BAR)
 
 # Check token exists
 github_token = os.getenv('GITHUB_TOKEN')
@@ -15,19 +32,20 @@ if not github_token:
     print("[ERROR] GITHUB_TOKEN not set!")
     exit(1)
 
-print(f"[OK] GITHUB_TOKEN is set (starts with: {github_token[:10]}...)")
+print(f"[OK] GITHUB_TOKEN is set ({mask_secret(github_token)})")
 
 # Check token format (GitHub supports both classic and fine-grained tokens)
-if github_token.startswith('ghp_'):
-    print("[OK] Token format: Classic Personal Access Token (ghp_)")
-elif github_token.startswith('github_pat_'):
-    print("[OK] Token format: Fine-grained Personal Access Token (github_pat_)")
+token_format = next(
+    (label for prefix, label in TOKEN_FORMATS if github_token.startswith(prefix)), None
+)
+if token_format:
+    print(f"[OK] Token format: {token_format}")
 else:
     print("[WARNING] Token format unexpected - should start with 'ghp_' or 'github_pat_'")
 
-print("\n" + "=" * 60)
+print("\n" + BAR)
 print("Testing GitHub MCP via E2B Sandbox")
-print("=" * 60)
+print(BAR)
 
 try:
     with DeepAgentE2B(sandbox_timeout=120) as agent:
@@ -48,22 +66,16 @@ try:
         if "messages" in result:
             for msg in result["messages"][-3:]:  # Show last few messages
                 if hasattr(msg, "content"):
-                    try:
-                        content = str(msg.content)[:500]  # Truncate long output
-                        # Handle Unicode for Windows console
-                        content = content.encode('ascii', 'replace').decode('ascii')
-                        print(f"  {content}")
-                    except Exception as e:
-                        print(f"  [Message content (encoding issue): {type(msg.content)}]")
+                    print(f"  {str(msg.content)[:500]}")  # Truncate long output
         
 except Exception as e:
     print(f"\n[ERROR] Failed: {e}")
     import traceback
     traceback.print_exc()
 
-print("\n" + "=" * 60)
+print("\n" + BAR)
 print("Recommendations")
-print("=" * 60)
+print(BAR)
 print("""
 If you got zero repos:
 1. Verify your GitHub token has these scopes:
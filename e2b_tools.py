@@ -5,31 +5,681 @@ This module provides LangChain-compatible tools for interacting with E2B sandbox
 enabling deep agents to execute commands, manage files, and interact with MCP servers.
 """
 
-from langchain_core.tools import tool
-from e2b import Sandbox
+import asyncio
+import base64
+import io
+import logging
+import re
+import shlex
+import tarfile
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from string import Template
+from typing import Optional
+import httpx
+import orjson
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+from e2b import CommandExitException, Sandbox
 from e2b.exceptions import AuthenticationException
 
+logger = logging.getLogger(__name__)
+
+
+# Failure patterns annotated in command results. The empty-dataset scan is
+# case-insensitive via the regex, so large stderr is never lowercased/copied.
+_ZERO_DIVISION_RE = re.compile(r"ZeroDivisionError")
+_EMPTY_DATASET_RE = re.compile(r"empty|no data", re.IGNORECASE)
+
+_ZERO_DIVISION_HINT = "\n[ERROR DETECTED] ZeroDivisionError: Division by zero occurred. This often happens when computing ratios with empty datasets. Check if your data source returned any results before performing division operations."
+_EMPTY_DATASET_HINT = "\n[WARNING] Empty dataset detected. Verify that your data source (GitHub MCP, Notion MCP, etc.) returned results and that you have proper permissions/scopes."
+
+
+# Longest exception detail echoed back to the agent; SDK errors can carry
+# entire HTTP response bodies
+_ERROR_DETAIL_LIMIT = 256
+
+
+def _errmsg(prefix: str, exc: BaseException) -> str:
+    """Format a tool error from the exception type and its first argument (or stderr), truncated."""
+    detail = getattr(exc, "stderr", None) or (exc.args[0] if exc.args else "")
+    detail = str(detail).strip()
+    if len(detail) > _ERROR_DETAIL_LIMIT:
+        detail = detail[:_ERROR_DETAIL_LIMIT] + "..."
+    return f"{prefix}: {type(exc).__name__}: {detail}"
+
+
+def _command_result(stdout: str, stderr: str, exit_code: int) -> dict:
+    """Build a command result dict, annotating common failure patterns for the agent."""
+    # Check for division by zero errors
+    if _ZERO_DIVISION_RE.search(stderr) or _ZERO_DIVISION_RE.search(stdout):
+        return {
+            "stdout": stdout,
+            "stderr": stderr + _ZERO_DIVISION_HINT,
+            "exit_code": exit_code,
+            "error_type": "ZeroDivisionError",
+        }
+
+    # Check for empty result patterns
+    if exit_code != 0 and _EMPTY_DATASET_RE.search(stderr):
+        return {
+            "stdout": stdout,
+            "stderr": stderr + _EMPTY_DATASET_HINT,
+            "exit_code": exit_code,
+            "error_type": "EmptyDataset",
+        }
+
+    return {
+        "stdout": stdout,
+        "stderr": stderr,
+        "exit_code": exit_code,
+    }
+
+
+# Sandbox-wide environment for Claude CLI MCP calls. Passed as the sandbox's
+# envs at creation so individual commands don't have to carry it.
+MCP_CLI_ENVS = {"MCP_TIMEOUT": "120000"}
+
+# Claude CLI fallback for MCP actions; the prompt is substituted shell-quoted
+_CLI_MCP_COMMAND = Template("echo $prompt | claude -p --dangerously-skip-permissions")
+
+# Upper bound on concurrent sandbox calls issued by parallel_map_tool
+_MAX_PARALLEL_CALLS = 16
+
+# Touched after each successful apt-get update in a sandbox; installs within
+# _APT_STAMP_MAX_AGE minutes of it skip re-downloading the package indexes
+_APT_STAMP = "/var/cache/apt/.e2b_updated"
+_APT_STAMP_MAX_AGE = 60
+
+# Serializes pip runs in a sandbox (install_sandbox_package, the MCP builder's
+# warm-up), which would otherwise race on the same site-packages
+PIP_LOCK_FILE = "/tmp/.e2b_pip.lock"
+
+# Recently read sandbox files: (sandbox_id, path) -> (stat signature, content).
+# A read sends the cached signature along, and the sandbox only streams the
+# file back if its mtime/size no longer match.
+_READ_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_READ_CACHE_SIZE = 256
+_READ_CACHE_LOCK = threading.Lock()
+
+# Files above this size are returned by read_sandbox_file as a head and tail
+# excerpt of _READ_EXCERPT bytes each rather than streamed back whole
+_READ_FULL_LIMIT = 256 * 1024
+_READ_EXCERPT = 128 * 1024
+
+
+# Event loop on a daemon thread that owns the async MCP client sessions, so the
+# sync LangChain tools can call into them without a per-call asyncio.run()
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+
+# owner/repo or owner/repo/commit_sha, as accepted by the GitHub MCP action tool
+_REPO_REF_RE = re.compile(r"([\w.-]+)/([\w.-]+)(?:/([0-9a-fA-F]{7,40}))?")
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide background event loop, starting it on first use."""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="e2b-mcp-loop", daemon=True).start()
+        return _LOOP
+
+
+def run_in_background_loop(coro, timeout: Optional[float] = None):
+    """
+    Run a coroutine on the shared background event loop and wait for its result.
+
+    Unlike asyncio.run(), this reuses one loop (and the HTTP connections opened
+    on it) across calls, and works when the caller already runs an event loop.
+
+    Args:
+        coro: Coroutine to run
+        timeout: Seconds to wait for the result (None waits indefinitely)
+
+    Returns:
+        The coroutine's result
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result(timeout)
+
+
+class _SharedTransport(httpx.AsyncHTTPTransport):
+    """Connection pool that outlives the clients using it; closing a client leaves it open."""
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+# One keep-alive pool per event loop (connections cannot move between loops),
+# shared by every MCP HTTP client created on that loop
+_MCP_TRANSPORTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _SharedTransport]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def mcp_http_client(
+    headers: Optional[dict[str, str]] = None,
+    timeout: Optional[httpx.Timeout] = None,
+    auth: Optional[httpx.Auth] = None,
+) -> httpx.AsyncClient:
+    """
+    httpx client factory for MCP streamable HTTP connections.
+
+    Drop-in for the MCP SDK's default factory (same defaults), except that all
+    clients on an event loop share one connection pool, so a new MCP session
+    to a gateway reuses an open TLS connection instead of handshaking again.
+    Pass it as ``httpx_client_factory`` to streamablehttp_client or a
+    langchain-mcp-adapters connection.
+    """
+    loop = asyncio.get_running_loop()
+    transport = _MCP_TRANSPORTS.get(loop)
+    if transport is None:
+        transport = _MCP_TRANSPORTS[loop] = _SharedTransport(
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        )
+    return httpx.AsyncClient(
+        transport=transport,
+        headers=headers,
+        timeout=timeout if timeout is not None else httpx.Timeout(30.0),
+        auth=auth,
+        follow_redirects=True,
+    )
+
+
+class _MCPGatewaySession:
+    """
+    Persistent MCP client session to a sandbox's MCP gateway.
+
+    Tool calls go straight to the gateway as MCP JSON-RPC over streamable
+    HTTP; the session is opened on first use and kept for later calls.
+    """
+
+    def __init__(self, url: str, token: str):
+        self.url = url
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self._session: Optional[ClientSession] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._tool_names: frozenset = frozenset()
+        self._lock = threading.Lock()
+
+    async def _serve(self, ready: asyncio.Future):
+        """Own the transport and session for their whole lifetime (anyio scopes are task-bound)."""
+        try:
+            async with streamablehttp_client(
+                self.url, headers=self.headers, httpx_client_factory=mcp_http_client
+            ) as (read, write, _):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    tools = await session.list_tools()
+                    self._tool_names = frozenset(t.name for t in tools.tools)
+                    self._stop = asyncio.Event()
+                    self._session = session
+                    ready.set_result(None)
+                    await self._stop.wait()
+        except BaseException as exc:
+            if not ready.done():
+                ready.set_exception(exc)
+            elif not ready.cancelled():
+                logger.warning("MCP gateway session ended: %s", exc)
+        finally:
+            self._session = None
+
+    def _ensure_open(self, timeout: float = 30):
+        with self._lock:
+            if self._session is not None:
+                return
+            loop = _background_loop()
+
+            async def start():
+                ready = loop.create_future()
+                task = loop.create_task(self._serve(ready))
+                try:
+                    await ready
+                except BaseException:
+                    # Do not leave a half-open session behind on the loop
+                    task.cancel()
+                    raise
+
+            future = asyncio.run_coroutine_threadsafe(start(), loop)
+            try:
+                future.result(timeout)
+            except BaseException:
+                future.cancel()
+                raise
+
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None
+
+    def tool_names(self) -> frozenset:
+        """Names of the tools exposed by the gateway."""
+        self._ensure_open()
+        return self._tool_names
+
+    def call_tool(self, name: str, arguments: dict, timeout: float = 120) -> tuple:
+        """
+        Call a gateway tool.
+
+        Returns:
+            (text output, is_error) tuple
+        """
+        self._ensure_open()
+        result = asyncio.run_coroutine_threadsafe(
+            self._session.call_tool(name, arguments), _background_loop()
+        ).result(timeout)
+        text = "\n".join(block.text for block in result.content if getattr(block, "type", None) == "text")
+        return text, result.isError
+
+    def close(self):
+        """End the session; a later call reopens it."""
+        if self._stop is not None and self._session is not None:
+            _background_loop().call_soon_threadsafe(self._stop.set)
+
+
+# Open MCP gateway sessions keyed by sandbox id, shared by every tool set built
+# for the same sandbox (e.g. a pooled sandbox picked up by a new agent). None
+# marks a sandbox without a reachable gateway.
+_MCP_SESSION_CACHE: dict[str, Optional[_MCPGatewaySession]] = {}
+_MCP_SESSION_CACHE_LOCK = threading.Lock()
+
+# Hit/miss counters reported by the get_cache_stats tool
+_CACHE_STATS = {
+    "mcp_session_hits": 0,
+    "mcp_session_misses": 0,
+    "mcp_result_hits": 0,
+    "mcp_result_misses": 0,
+}
+_CACHE_STATS_LOCK = threading.Lock()
+
+
+def _count(stat: str):
+    with _CACHE_STATS_LOCK:
+        _CACHE_STATS[stat] += 1
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire ``ttl`` seconds after being stored."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard_if(self, predicate) -> int:
+        """Remove every entry whose key satisfies ``predicate``; returns how many were removed."""
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                del self._data[key]
+        return len(stale)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Successful MCP action results keyed by (sandbox_id, server, action, query),
+# so repeated reads (e.g. get_repository during an evaluation) skip the round trip
+_MCP_RESULT_CACHE = TTLCache(maxsize=1024, ttl=300)
+
+# Actions known to be read-only (GitHub's get_/list_/search_..., Notion's
+# API-get-/API-retrieve-/API-query-...); only these are cached. Every other
+# action is treated as mutating: never cached, and it invalidates the cached
+# results of the same server
+READ_ONLY_ACTION_RE = re.compile(
+    r"(get|list|search|read|fetch)[_-]|API-(get|retrieve|query)-",
+    re.IGNORECASE,
+)
+
+
+def drop_mcp_session(sandbox_id: str):
+    """Close and forget the cached MCP gateway session of a sandbox (e.g. once it is killed)."""
+    with _MCP_SESSION_CACHE_LOCK:
+        session = _MCP_SESSION_CACHE.pop(sandbox_id, None)
+    if session is not None:
+        session.close()
+
+
+def _mcp_arguments(action: str, query: str) -> dict:
+    """
+    Turn an MCP action tool's free-form query into structured tool arguments.
+
+    Accepts a JSON object verbatim, 'owner/repo[/sha]' references, and
+    otherwise passes the text as the tool's 'query' argument.
+    """
+    query = query.strip()
+    if not query:
+        return {}
+    if query.startswith("{"):
+        arguments = orjson.loads(query)
+        if not isinstance(arguments, dict):
+            raise ValueError("JSON query must be an object")
+        return arguments
+    if not action.startswith("search_"):
+        match = _REPO_REF_RE.fullmatch(query)
+        if match:
+            owner, repo, sha = match.groups()
+            arguments = {"owner": owner, "repo": repo}
+            if sha:
+                arguments["sha"] = sha
+            return arguments
+    return {"query": query}
+
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+_JSON_FENCE_RE = re.compile(r"```(?:json)?[ \t]*\n(.*)\n\s*```", re.DOTALL)
+
+
+def _extract_json(text: str):
+    """
+    Parse MCP output that is entirely JSON.
+
+    Accepts the whole stripped text, or a single fenced ```json block that
+    makes up the whole text. JSON embedded in prose is left alone so no
+    part of the reply is lost.
+
+    Returns:
+        The parsed dict or list, or None if the text is not a JSON payload
+    """
+    candidate = text.strip()
+    fence = _JSON_FENCE_RE.fullmatch(candidate)
+    if fence:
+        candidate = fence.group(1)
+    try:
+        parsed = orjson.loads(candidate)
+    except orjson.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, (dict, list)) else None
+
+
+def _mcp_result(action: str, query: str, output: str, error: str) -> dict:
+    """
+    Build an MCP action result, returning JSON output as parsed ``data``.
+
+    Parsed data replaces the raw text so the agent is not handed the same
+    payload twice; any other output is returned as ``output`` minus ANSI codes.
+    """
+    output = _ANSI_RE.sub("", output or "")
+    result = {"action": action, "query": query}
+    parsed = _extract_json(output) if output else None
+    if parsed is not None:
+        result["data"] = parsed
+    else:
+        result["output"] = output
+    result["error"] = _ANSI_RE.sub("", error or "")
+    return result
+
+
+def _build_read_command(path: str, known_signature: str) -> str:
+    """
+    Stat a file and send it only when its signature differs from the cached one.
+
+    Files larger than _READ_FULL_LIMIT are sent as head and tail excerpts;
+    read_sandbox_file_range reads any other part.
+    """
+    quoted = shlex.quote(path)
+    return (
+        f"sig=$(stat -c '%.9Y:%s' -- {quoted}) || exit 1; "
+        f'echo "$sig"; '
+        f"[ \"$sig\" = {shlex.quote(known_signature)} ] && exit 0; "
+        f'size=${{sig#*:}}; '
+        f'if [ "$size" -gt {_READ_FULL_LIMIT} ]; then '
+        f"head -c {_READ_EXCERPT} -- {quoted}; "
+        f'printf "\\n... [%s bytes omitted; use read_sandbox_file_range] ...\\n" $((size - {2 * _READ_EXCERPT})); '
+        f"tail -c {_READ_EXCERPT} -- {quoted}; "
+        f"else cat -- {quoted}; fi"
+    )
+
+
+def _build_batch_script(commands: list, token: str, parallel: bool) -> str:
+    """
+    Build one shell script that runs every command and reports each result.
+
+    Each command runs in its own subshell with stdout/stderr captured to temp
+    files; afterwards one line per command is emitted as
+    ``<token> <index> <exit_code> <base64 stdout> <base64 stderr>`` so the
+    combined output can be split back apart unambiguously.
+    """
+    background = " &" if parallel else ""
+    lines = ['_d=$(mktemp -d)']
+    for i, command in enumerate(commands):
+        lines.append(
+            f'( (\n{command}\n) >"$_d/{i}.out" 2>"$_d/{i}.err"; echo $? >"$_d/{i}.rc" ){background}'
+        )
+    if parallel:
+        lines.append("wait")
+    lines.append(
+        f'for _i in $(seq 0 {len(commands) - 1}); do '
+        f'echo "{token} $_i $(cat "$_d/$_i.rc") '
+        f'$(base64 -w0 <"$_d/$_i.out") $(base64 -w0 <"$_d/$_i.err")"; done'
+    )
+    lines.append('rm -rf "$_d"')
+    return "\n".join(lines)
+
+
+def _parse_batch_output(stdout: str, token: str, count: int) -> list:
+    """Split the output of a batch script back into per-command results."""
+    results = [None] * count
+    for line in stdout.splitlines():
+        if not line.startswith(token + " "):
+            continue
+        _, index, exit_code, out, err = line.split(" ", 4)
+        results[int(index)] = _command_result(
+            base64.b64decode(out).decode("utf-8", "replace"),
+            base64.b64decode(err).decode("utf-8", "replace"),
+            int(exit_code),
+        )
+    return [
+        result if result is not None else {
+            "stdout": "",
+            "stderr": "No result reported (batch timed out or was interrupted)",
+            "exit_code": 1,
+            "error_type": "CommandExecutionError",
+        }
+        for result in results
+    ]
+
 
 class E2BSandboxTools:
     """
     Wrapper class for E2B sandbox operations that can be used as LangChain tools.
     """
 
-    def __init__(self, sandbox: Sandbox):
+    def __init__(self, sandbox: Sandbox, cli_mcp_token: Optional[str] = None):
         """
         Initialize E2B sandbox tools.
 
         Args:
             sandbox: An active E2B sandbox instance
+            cli_mcp_token: MCP gateway token for sandboxes from the
+                deep-agent-claude template (build_template.py), whose Claude CLI
+                config reads it from E2B_MCP_TOKEN
         """
         self.sandbox = sandbox
+        # Environment for the Claude CLI fallback; the token is only known
+        # after the sandbox is created, so it cannot be a sandbox-level env var
+        self._cli_envs = {"E2B_MCP_TOKEN": cli_mcp_token} if cli_mcp_token else None
+        # get_sandbox_info result; fixed for the sandbox's lifetime since every
+        # command starts a fresh shell in the same user/home
+        self._info_cache: Optional[dict] = None
+
+    def _mcp_gateway(self) -> Optional[_MCPGatewaySession]:
+        """Return the sandbox's shared MCP gateway session; None if it is unavailable."""
+        if not hasattr(self, "_gateway"):
+            sandbox_id = getattr(self.sandbox, "sandbox_id", None)
+            with _MCP_SESSION_CACHE_LOCK:
+                if sandbox_id in _MCP_SESSION_CACHE:
+                    self._gateway = _MCP_SESSION_CACHE[sandbox_id]
+                    return self._gateway
+                try:
+                    self._gateway = _MCPGatewaySession(
+                        self.sandbox.beta_get_mcp_url(), self.sandbox.beta_get_mcp_token()
+                    )
+                except Exception as exc:
+                    logger.info("MCP gateway unavailable, using Claude CLI: %s", exc)
+                    self._gateway = None
+                if sandbox_id is not None:
+                    _MCP_SESSION_CACHE[sandbox_id] = self._gateway
+        return self._gateway
+
+    def _forget_gateway(self, gateway: _MCPGatewaySession):
+        """Remember that the sandbox's gateway is unreachable, so later actions go straight to the CLI."""
+        self._gateway = None
+        sandbox_id = getattr(self.sandbox, "sandbox_id", None)
+        with _MCP_SESSION_CACHE_LOCK:
+            if sandbox_id is not None and _MCP_SESSION_CACHE.get(sandbox_id) is gateway:
+                _MCP_SESSION_CACHE[sandbox_id] = None
 
-    def _with_auth_guard(self, operation: str, func):
+    def _run_mcp_action(self, server: str, action: str, query: str, cli_prompt: str) -> dict:
         """
-        Execute a sandbox call and raise a friendlier error on authentication issues.
+        Run an MCP action, serving repeated read-only actions from the result cache.
+
+        Actions not known to be read-only are never cached and invalidate the
+        server's cached results in this sandbox.
+        """
+        sandbox_id = getattr(self.sandbox, "sandbox_id", None)
+        if not READ_ONLY_ACTION_RE.match(action):
+            self.invalidate_mcp_results(server)
+            return self._call_mcp_action(server, action, query, cli_prompt)
+
+        key = (sandbox_id, server, action, query)
+        cached = _MCP_RESULT_CACHE.get(key)
+        if cached is not None:
+            _count("mcp_result_hits")
+            return dict(cached)
+        _count("mcp_result_misses")
+
+        result = self._call_mcp_action(server, action, query, cli_prompt)
+        if not result["error"]:
+            _MCP_RESULT_CACHE.set(key, dict(result))
+        return result
+
+    def invalidate_mcp_results(self, server: str, action_prefix: str = "") -> int:
+        """Drop this sandbox's cached results for ``server`` actions starting with ``action_prefix``."""
+        sandbox_id = getattr(self.sandbox, "sandbox_id", None)
+        return _MCP_RESULT_CACHE.discard_if(
+            lambda key: key[0] == sandbox_id and key[1] == server and key[2].startswith(action_prefix)
+        )
+
+    def _call_mcp_action(self, server: str, action: str, query: str, cli_prompt: str) -> dict:
+        """
+        Run an MCP action, calling the gateway tool directly when ``action`` names one.
+
+        Free-form actions (or a gateway whose session cannot be opened) fall
+        back to asking Claude CLI inside the sandbox to pick and call the tool.
+        A direct call that fails is reported, not retried through the CLI: the
+        gateway may already have run it, and actions are not idempotent.
+        """
+        operation = f"execute_{server}_mcp_action"
+        gateway = self._mcp_gateway()
+        if gateway is not None:
+            _count("mcp_session_hits" if gateway.is_open else "mcp_session_misses")
+            try:
+                tool_names = gateway.tool_names()
+            except Exception as exc:
+                logger.warning("MCP gateway session could not be opened, using Claude CLI: %s", exc)
+                self._forget_gateway(gateway)
+                tool_names = frozenset()
+            if action in tool_names:
+                try:
+                    arguments = _mcp_arguments(action, query)
+                except ValueError as exc:
+                    return {"action": action, "query": query, "output": "", "error": f"Invalid query: {exc}"}
+                try:
+                    output, is_error = gateway.call_tool(action, arguments)
+                except Exception as exc:
+                    logger.warning("Direct MCP call %s failed: %s", action, exc)
+                    gateway.close()
+                    return _mcp_result(action, query, "", _errmsg("MCP call failed", exc))
+                if is_error:
+                    return _mcp_result(action, query, "", output)
+                return _mcp_result(action, query, output, "")
+
+        command = _CLI_MCP_COMMAND.substitute(prompt=shlex.quote(cli_prompt))
+        with self._auth_guard(operation):
+            result = self.sandbox.commands.run(command, timeout=120, envs=self._cli_envs)
+        return _mcp_result(action, query, result.stdout, result.stderr)
+
+    def _run_batch(
+        self, commands: list, timeout: int = 60, parallel: bool = False, operation: str = "batch"
+    ) -> list:
+        """
+        Run several commands in one sandbox round trip.
+
+        Returns:
+            One command result dict per command, in order
+        """
+        if not commands:
+            return []
+
+        token = f"__E2B_BATCH_{uuid.uuid4().hex}__"
+        script = _build_batch_script(commands, token, parallel)
+        try:
+            with self._auth_guard(operation):
+                result = self.sandbox.commands.run(script, timeout=timeout)
+        except CommandExitException as exc:
+            # The exception carries whatever output the batch produced
+            result = exc
+        return _parse_batch_output(result.stdout or "", token, len(commands))
+
+    def sandbox_info(self, refresh: bool = False) -> dict:
+        """
+        Return the sandbox's id, template and system details, querying them once.
+
+        Args:
+            refresh: Re-query the sandbox instead of returning the cached details
+
+        Returns:
+            Dictionary with sandbox details
+        """
+        if refresh or self._info_cache is None:
+            uname, cwd, user, os_release = self._run_batch(
+                ["uname -a", "pwd", "whoami", "cat /etc/os-release"],
+                operation="get_sandbox_info",
+            )
+            self._info_cache = {
+                "sandbox_id": getattr(self.sandbox, "sandbox_id", "unknown"),
+                "template": getattr(self.sandbox, "template", "default"),
+                "system_info": uname["stdout"] + cwd["stdout"] + user["stdout"],
+                "os_release": os_release["stdout"],
+            }
+        return dict(self._info_cache)
+
+    @contextmanager
+    def _auth_guard(self, operation: str):
+        """
+        Guard a sandbox call and raise a friendlier error on authentication issues.
         """
         try:
-            return func()
+            yield
         except AuthenticationException as exc:
             sandbox_id = getattr(self.sandbox, "sandbox_id", "unknown")
             raise RuntimeError(
@@ -38,17 +688,21 @@ class E2BSandboxTools:
             ) from exc
 
     @staticmethod
-    def create_tools(sandbox: Sandbox) -> list:
+    def create_tools(sandbox: Sandbox, cli_mcp_token: Optional[str] = None) -> list:
         """
         Create a list of LangChain tools for E2B sandbox operations.
 
         Args:
             sandbox: An active E2B sandbox instance
+            cli_mcp_token: MCP gateway token passed to Claude CLI (template sandboxes only)
 
         Returns:
             List of LangChain tools
         """
-        tools_instance = E2BSandboxTools(sandbox)
+        # Imported here: the module's helpers are usable without LangChain loaded
+        from langchain_core.tools import StructuredTool, tool
+
+        tools_instance = E2BSandboxTools(sandbox, cli_mcp_token)
 
         @tool
         def execute_sandbox_command(command: str, timeout: int = 60) -> dict:
@@ -63,10 +717,8 @@ class E2BSandboxTools:
                 Dictionary with stdout, stderr, and exit_code
             """
             try:
-                result = tools_instance._with_auth_guard(
-                    "execute_sandbox_command",
-                    lambda: tools_instance.sandbox.commands.run(command, timeout=timeout),
-                )
+                with tools_instance._auth_guard("execute_sandbox_command"):
+                    result = tools_instance.sandbox.commands.run(command, timeout=timeout)
                 
                 # Enhanced error detection for common issues
                 stderr = result.stderr or ""
@@ -76,34 +728,45 @@ class E2BSandboxTools:
                 # Handle cases where commands.run raises an exception (e.g. non-zero exit code in newer E2B SDK)
                 return {
                     "stdout": "",
-                    "stderr": f"Command failed with exception: {str(e)}",
+                    "stderr": _errmsg("Command failed with exception", e),
                     "exit_code": 1,
                     "error_type": "CommandExecutionError",
                 }
 
-            # Check for division by zero errors
-            if "ZeroDivisionError" in stderr or "ZeroDivisionError" in stdout:
-                return {
-                    "stdout": stdout,
-                    "stderr": stderr + "\n[ERROR DETECTED] ZeroDivisionError: Division by zero occurred. This often happens when computing ratios with empty datasets. Check if your data source returned any results before performing division operations.",
-                    "exit_code": exit_code,
-                    "error_type": "ZeroDivisionError",
-                }
-            
-            # Check for empty result patterns
-            if exit_code != 0 and ("empty" in stderr.lower() or "no data" in stderr.lower()):
-                return {
-                    "stdout": stdout,
-                    "stderr": stderr + "\n[WARNING] Empty dataset detected. Verify that your data source (GitHub MCP, Notion MCP, etc.) returned results and that you have proper permissions/scopes.",
-                    "exit_code": exit_code,
-                    "error_type": "EmptyDataset",
-                }
-            
-            return {
-                "stdout": stdout,
-                "stderr": stderr,
-                "exit_code": exit_code,
-            }
+            return _command_result(stdout, stderr, exit_code)
+
+        @tool
+        def batch_execute_sandbox_commands(
+            commands: list[str], timeout: int = 60, parallel: bool = False
+        ) -> list:
+            """
+            Execute several shell commands in the E2B sandbox in a single round trip.
+
+            Prefer this over repeated execute_sandbox_command calls when a plan
+            needs multiple independent commands (e.g. inspecting several files or
+            checking tool versions).
+
+            Args:
+                commands: Shell commands to execute, in order
+                timeout: Timeout in seconds for the whole batch (0 for no timeout)
+                parallel: If True, run the commands concurrently inside the sandbox
+
+            Returns:
+                One dictionary per command with stdout, stderr, and exit_code
+            """
+            try:
+                return tools_instance._run_batch(
+                    commands, timeout, parallel, operation="batch_execute_sandbox_commands"
+                )
+            except Exception as e:
+                return [
+                    {
+                        "stdout": "",
+                        "stderr": _errmsg("Command failed with exception", e),
+                        "exit_code": 1,
+                        "error_type": "CommandExecutionError",
+                    }
+                ] * len(commands)
 
         @tool
         def read_sandbox_file(path: str) -> str:
@@ -116,16 +779,103 @@ class E2BSandboxTools:
             Returns:
                 File contents as string
             """
+            key = (getattr(tools_instance.sandbox, "sandbox_id", None), path)
+            with _READ_CACHE_LOCK:
+                cached = _READ_CACHE.get(key)
+            known_signature = cached[0] if cached else ""
+
             try:
-                content = tools_instance._with_auth_guard(
-                    "read_sandbox_file",
-                    lambda: tools_instance.sandbox.files.read(path),
-                )
-                if isinstance(content, bytes):
-                    return content.decode("utf-8")
-                return content
+                with tools_instance._auth_guard("read_sandbox_file"):
+                    result = tools_instance.sandbox.commands.run(
+                        _build_read_command(path, known_signature)
+                    )
             except Exception as e:
-                return f"Error reading file: {str(e)}"
+                return _errmsg("Error reading file", e)
+
+            signature, _, content = (result.stdout or "").partition("\n")
+            with _READ_CACHE_LOCK:
+                if cached and signature == known_signature:
+                    _READ_CACHE.move_to_end(key)
+                    return cached[1]
+                _READ_CACHE[key] = (signature, content)
+                if len(_READ_CACHE) > _READ_CACHE_SIZE:
+                    _READ_CACHE.popitem(last=False)
+            return content
+
+        @tool
+        def read_sandbox_file_range(path: str, start: int = 0, end: int = 65536) -> str:
+            """
+            Read a byte range of a file in the E2B sandbox.
+
+            Use this for the parts of large files (over 256 KB) that
+            read_sandbox_file omits.
+
+            Args:
+                path: Absolute path to the file in the sandbox
+                start: Offset of the first byte to read
+                end: Offset just past the last byte to read
+
+            Returns:
+                The requested bytes decoded as text
+            """
+            if start < 0 or end <= start:
+                return "Error reading file: expected 0 <= start < end"
+            command = (
+                f"dd if={shlex.quote(path)} bs=65536 skip={start} count={end - start} "
+                "iflag=skip_bytes,count_bytes status=none"
+            )
+            try:
+                with tools_instance._auth_guard("read_sandbox_file_range"):
+                    result = tools_instance.sandbox.commands.run(command)
+            except Exception as e:
+                return _errmsg("Error reading file", e)
+            return result.stdout
+
+        @tool
+        def read_sandbox_files(paths: list[str]) -> dict:
+            """
+            Read several files from the E2B sandbox filesystem in a single round trip.
+
+            Args:
+                paths: Absolute paths of the files to read
+
+            Returns:
+                Dictionary mapping each path to its contents (or an error message)
+            """
+            if not paths:
+                return {}
+
+            quoted = " ".join(shlex.quote(path) for path in paths)
+            # -P keeps each member name exactly as requested (no stripping of
+            # "/" or "../"), so results map back by the path the caller gave
+            command = (
+                f"tar -P --no-recursion --hard-dereference -cf - -- {quoted} 2>/dev/null"
+                " | base64 -w0"
+            )
+            try:
+                with tools_instance._auth_guard("read_sandbox_files"):
+                    result = tools_instance.sandbox.commands.run(command)
+            except CommandExitException as e:
+                # tar still archives the readable files when some are missing
+                result = e
+            except Exception as e:
+                return {path: _errmsg("Error reading file", e) for path in paths}
+
+            contents = {}
+            try:
+                archive = base64.b64decode(result.stdout or "")
+                with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+                    for member in tar:
+                        if member.isfile():
+                            data = tar.extractfile(member).read()
+                            contents[member.name] = data.decode("utf-8", "replace")
+            except (tarfile.TarError, ValueError) as e:
+                return {path: _errmsg("Error reading file", e) for path in paths}
+
+            return {
+                path: contents.get(path, "Error reading file: not found or not a regular file")
+                for path in paths
+            }
 
         @tool
         def write_sandbox_file(path: str, content: str) -> str:
@@ -140,36 +890,53 @@ class E2BSandboxTools:
                 Success message or error
             """
             try:
-                tools_instance._with_auth_guard(
-                    "write_sandbox_file",
-                    lambda: tools_instance.sandbox.files.write(path, content),
-                )
+                with tools_instance._auth_guard("write_sandbox_file"):
+                    tools_instance.sandbox.files.write(path, content)
                 return f"Successfully wrote to {path}"
             except Exception as e:
-                return f"Error writing file: {str(e)}"
+                return _errmsg("Error writing file", e)
 
         @tool
-        def list_sandbox_directory(path: str = "/home/user") -> list:
+        def list_sandbox_directory(path: str = "/home/user", detailed: bool = False) -> list:
             """
             List contents of a directory in the E2B sandbox.
 
             Args:
                 path: Directory path to list (default: /home/user)
+                detailed: If True, return name, type, and size for each entry
 
             Returns:
-                List of file and directory names
+                List of file and directory names (or entry dictionaries if detailed)
             """
             try:
-                result = tools_instance._with_auth_guard(
-                    "list_sandbox_directory",
-                    lambda: tools_instance.sandbox.commands.run(f"ls -la {path}"),
-                )
-                return result.stdout.split("\n")
+                with tools_instance._auth_guard("list_sandbox_directory"):
+                    entries = tools_instance.sandbox.files.list(path)
             except Exception as e:
-                return [f"Error listing directory: {str(e)}"]
+                return [_errmsg("Error listing directory", e)]
 
-        @tool
-        def execute_github_mcp_action(action: str, query: str = "") -> dict:
+            entries = sorted(entries, key=lambda entry: entry.name)
+            if not detailed:
+                return [entry.name for entry in entries]
+            return [
+                {
+                    "name": entry.name,
+                    "type": entry.type.value if entry.type else None,
+                    "size": entry.size,
+                }
+                for entry in entries
+            ]
+
+        def _make_mcp_tool(server: str, docstring: str, build_prompt):
+            """Build the execute_<server>_mcp_action tool; build_prompt phrases the Claude CLI fallback."""
+
+            def mcp_action(action: str, query: str = "") -> dict:
+                return tools_instance._run_mcp_action(server, action, query, build_prompt(action, query))
+
+            mcp_action.__doc__ = docstring
+            return tool(f"execute_{server}_mcp_action")(mcp_action)
+
+        execute_github_mcp_action = _make_mcp_tool(
+            "github",
             """
             Execute a GitHub MCP server action through the sandbox.
 
@@ -182,40 +949,28 @@ class E2BSandboxTools:
             - 'get_repository' - Get specific repo info (query: 'owner/repo')
             - 'get_commit' - Get commit info (query: 'owner/repo/commit_sha')
             - 'list_issues' - List issues (query: 'owner/repo')
-            
+
             To list YOUR repositories:
             1. First use 'get_me' to get your username
             2. Then use 'search_repositories' with query 'user:YOUR_USERNAME'
-            
+
             Args:
                 action: The GitHub MCP tool name (e.g., 'search_repositories', 'get_me', 'get_repository')
-                query: Query parameters (e.g., 'user:HarleyCoops' for search_repositories, 'owner/repo' for get_repository)
+                query: Query parameters (e.g., 'user:HarleyCoops' for search_repositories, 'owner/repo' for get_repository),
+                    or a JSON object of exact tool arguments
 
             Returns:
-                Dictionary with action results
-            """
-            # Use Claude CLI with MCP in the sandbox to execute GitHub actions
-            # Format the command to use the correct GitHub MCP tool
-            if query:
-                command = f'echo "Use GitHub MCP tool {action} with query: {query}" | claude -p --dangerously-skip-permissions'
-            else:
-                command = f'echo "Use GitHub MCP tool {action}" | claude -p --dangerously-skip-permissions'
-            
-            result = tools_instance._with_auth_guard(
-                "execute_github_mcp_action",
-                lambda: tools_instance.sandbox.commands.run(
-                    command, timeout=120, envs={"MCP_TIMEOUT": "120000"}
-                ),
-            )
-            return {
-                "action": action,
-                "query": query,
-                "output": result.stdout,
-                "error": result.stderr,
-            }
+                Dictionary with action results: parsed JSON under 'data', or the
+                raw text under 'output', plus any 'error'
+            """,
+            lambda action, query: (
+                f"Use GitHub MCP tool {action} with query: {query}" if query
+                else f"Use GitHub MCP tool {action}"
+            ),
+        )
 
-        @tool
-        def execute_notion_mcp_action(action: str, query: str = "") -> dict:
+        execute_notion_mcp_action = _make_mcp_tool(
+            "notion",
             """
             Execute a Notion MCP server action through the sandbox.
 
@@ -223,48 +978,77 @@ class E2BSandboxTools:
             to perform Notion operations like creating pages, searching databases, etc.
 
             Args:
-                action: The Notion action to perform (e.g., 'create_page', 'search')
-                query: Additional query parameters or content
+                action: The Notion action to perform (e.g., 'create_page', 'search'),
+                    or the exact Notion MCP tool name
+                query: Additional query parameters or content, or a JSON object of
+                    exact tool arguments
 
             Returns:
-                Dictionary with action results
+                Dictionary with action results: parsed JSON under 'data', or the
+                raw text under 'output', plus any 'error'
+            """,
+            lambda action, query: f"Use Notion MCP to {action} {query}",
+        )
+
+        @tool
+        def invalidate_mcp_cache(server: str = "", action_prefix: str = "") -> dict:
             """
-            # Use Claude CLI with MCP in the sandbox to execute Notion actions
-            command = f'echo "Use Notion MCP to {action} {query}" | claude -p --dangerously-skip-permissions'
-            result = tools_instance._with_auth_guard(
-                "execute_notion_mcp_action",
-                lambda: tools_instance.sandbox.commands.run(
-                    command, timeout=120, envs={"MCP_TIMEOUT": "120000"}
-                ),
-            )
-            return {
-                "action": action,
-                "query": query,
-                "output": result.stdout,
-                "error": result.stderr,
-            }
+            Discard cached MCP action results so the next call fetches fresh data.
+
+            Results of read-only GitHub/Notion actions (get_*, list_*, search_*,
+            API-get-*, ...) are cached for a few minutes; every other action
+            already invalidates its server's cache automatically.
+
+            Args:
+                server: 'github' or 'notion' (empty for both)
+                action_prefix: Only drop results of actions starting with this prefix
+
+            Returns:
+                Dictionary with the number of cached results removed
+            """
+            servers = [server] if server else ["github", "notion"]
+            removed = sum(tools_instance.invalidate_mcp_results(name, action_prefix) for name in servers)
+            return {"removed": removed}
 
         @tool
-        def install_sandbox_package(package: str, use_pip: bool = True) -> dict:
+        def install_sandbox_package(
+            package: str = "", use_pip: bool = True, packages: Optional[list[str]] = None
+        ) -> dict:
             """
-            Install a Python or system package in the E2B sandbox.
+            Install one or more Python or system packages in the E2B sandbox.
 
             Args:
-                package: Package name to install
+                package: Package name (or space-separated names) to install
                 use_pip: If True, use pip; if False, use apt-get
+                packages: Additional package names, installed in the same command
 
             Returns:
                 Installation result
             """
+            try:
+                names = shlex.split(package) + list(packages or [])
+            except ValueError as e:
+                return {"package": package, "stdout": "", "stderr": _errmsg("Invalid package list", e), "exit_code": 1}
+            if not names:
+                return {"package": "", "stdout": "", "stderr": "No package specified", "exit_code": 1}
+            quoted = " ".join(shlex.quote(name) for name in names)
+            package = " ".join(names)
+
             if use_pip:
-                command = f"pip install {package}"
+                command = f"flock {PIP_LOCK_FILE} pip install -q --prefer-binary {quoted}"
             else:
-                command = f"sudo apt-get update && sudo apt-get install -y {package}"
+                fresh = f"find {_APT_STAMP} -mmin -{_APT_STAMP_MAX_AGE} 2>/dev/null"
+                command = (
+                    f'{{ [ -n "$({fresh})" ] || {{ sudo apt-get update && sudo touch {_APT_STAMP}; }}; }}'
+                    f" && sudo apt-get install -y -q --no-install-recommends {quoted}"
+                )
 
-            result = tools_instance._with_auth_guard(
-                "install_sandbox_package",
-                lambda: tools_instance.sandbox.commands.run(command, timeout=300),
-            )
+            try:
+                with tools_instance._auth_guard("install_sandbox_package"):
+                    result = tools_instance.sandbox.commands.run(command, timeout=300)
+            except CommandExitException as e:
+                # A failed install is reported to the agent, not raised
+                result = e
             return {
                 "package": package,
                 "stdout": result.stdout,
@@ -277,32 +1061,99 @@ class E2BSandboxTools:
             """
             Get information about the E2B sandbox environment.
 
+            The details are fixed for the sandbox's lifetime and cached after
+            the first call; use refresh_sandbox_info to re-query them.
+
             Returns:
                 Dictionary with sandbox details
             """
-            info = {
-                "sandbox_id": getattr(tools_instance.sandbox, "sandbox_id", "unknown"),
-                "template": getattr(
-                    tools_instance.sandbox, "template", "default"
-                ),
-            }
+            return tools_instance.sandbox_info()
 
-            # Get system information
-            result = tools_instance._with_auth_guard(
-                "get_sandbox_info",
-                lambda: tools_instance.sandbox.commands.run("uname -a && pwd && whoami"),
-            )
-            info["system_info"] = result.stdout
+        @tool
+        def refresh_sandbox_info() -> dict:
+            """
+            Re-query the E2B sandbox environment details, replacing the cached copy.
+
+            Returns:
+                Dictionary with sandbox details
+            """
+            return tools_instance.sandbox_info(refresh=True)
 
-            return info
+        @tool
+        def get_cache_stats() -> dict:
+            """
+            Report hit/miss counters for the sandbox tool caches.
 
-        return [
+            Returns:
+                Dictionary with cache sizes and hit/miss counts
+            """
+            with _CACHE_STATS_LOCK:
+                stats = dict(_CACHE_STATS)
+            with _MCP_SESSION_CACHE_LOCK:
+                stats["mcp_sessions"] = sum(1 for s in _MCP_SESSION_CACHE.values() if s is not None)
+            with _READ_CACHE_LOCK:
+                stats["read_cache_entries"] = len(_READ_CACHE)
+            stats["mcp_result_entries"] = len(_MCP_RESULT_CACHE)
+            return stats
+
+        tools = [
             execute_sandbox_command,
+            batch_execute_sandbox_commands,
             read_sandbox_file,
+            read_sandbox_file_range,
+            read_sandbox_files,
             write_sandbox_file,
             list_sandbox_directory,
             execute_github_mcp_action,
             execute_notion_mcp_action,
+            invalidate_mcp_cache,
             install_sandbox_package,
             get_sandbox_info,
+            refresh_sandbox_info,
+            get_cache_stats,
         ]
+        tools_by_name = {t.name: t for t in tools}
+
+        def _unknown_tool(tool_name: str) -> list:
+            return [f"Error: unknown tool '{tool_name}'. Available: {', '.join(tools_by_name)}"]
+
+        def parallel_map_tool(tool_name: str, args_list: list[dict]) -> list:
+            """
+            Call one sandbox tool concurrently for each set of arguments.
+
+            Use this for independent calls that would otherwise run one after
+            another, e.g. fetching details of several repositories with
+            execute_github_mcp_action.
+
+            Args:
+                tool_name: Name of the tool to call (e.g. 'execute_github_mcp_action')
+                args_list: One dictionary of tool arguments per call
+
+            Returns:
+                Results in the same order as args_list
+            """
+            mapped = tools_by_name.get(tool_name)
+            if mapped is None:
+                return _unknown_tool(tool_name)
+            if not args_list:
+                return []
+            workers = min(_MAX_PARALLEL_CALLS, len(args_list))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(mapped.invoke, args_list))
+
+        async def aparallel_map_tool(tool_name: str, args_list: list[dict]) -> list:
+            mapped = tools_by_name.get(tool_name)
+            if mapped is None:
+                return _unknown_tool(tool_name)
+            semaphore = asyncio.Semaphore(_MAX_PARALLEL_CALLS)
+
+            async def call(args: dict):
+                async with semaphore:
+                    return await mapped.ainvoke(args)
+
+            return list(await asyncio.gather(*(call(args) for args in args_list)))
+
+        tools.append(
+            StructuredTool.from_function(func=parallel_map_tool, coroutine=aparallel_map_tool)
+        )
+        return tools
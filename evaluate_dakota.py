@@ -1,5 +1,7 @@
 
+import logging
 import os
+import sys
 import dotenv
 import asyncio
 
@@ -12,7 +14,15 @@ from deep_agent import DeepAgentE2B
 # Load environment variables
 dotenv.load_dotenv()
 
+# Replies printed between explicit flushes of a buffered (redirected) stdout
+FLUSH_EVERY = 10
+
 async def main():
+    # Transcripts are long; when captured to a file or pipe, buffer them
+    # instead of writing through on every line
+    if not sys.stdout.isatty():
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+
     # Define the task based on the user's request
     task = r"""
     I want you to evaluate the significance of the following mathematical framework in the context of generalized learning and the repository 'HarleyCoops/Dakota1890'.
@@ -61,30 +71,21 @@ async def main():
     
     # Initialize the agent
     with DeepAgentE2B() as agent:
-        # Run the evaluation task
-        result = await agent.ainvoke(task)
-        
         print("\n" + "=" * 80)
         print("EVALUATION RESULTS:")
         print("=" * 80)
-        
-        # Print the result (handling potential structure of the result)
-        if isinstance(result, dict) and "messages" in result:
-             for msg in result["messages"]:
-                 # Check if it's an object with 'type' or 'role' attributes (LangChain messages)
-                 role = getattr(msg, "type", None) or getattr(msg, "role", None)
-                 content = getattr(msg, "content", str(msg))
-                 
-                 # If it's a dict (legacy/compatibility)
-                 if isinstance(msg, dict):
-                     role = msg.get("role")
-                     content = msg.get("content")
-
-                 if role == "ai" or role == "assistant":
-                     print(content)
-        else:
-             print(result)
+
+        # Run the evaluation task, printing the agent's replies as they arrive
+        printed = 0
+        async for msg in agent.astream_messages(task):
+            if getattr(msg, "type", None) == "ai" and msg.text:
+                print(msg.text)
+                printed += 1
+                if printed % FLUSH_EVERY == 0:
+                    sys.stdout.flush()
+        sys.stdout.flush()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     asyncio.run(main())
 
@@ -5,7 +5,8 @@ This example demonstrates the agent's ability to build custom MCP servers.
 The agent will create an MCP server for the JSONPlaceholder API autonomously.
 """
 
-from deep_agent import DeepAgentE2B
+# deep_agent (LangChain, LangGraph, E2B) is imported inside each example so
+# the CLI only pays for it once an example actually runs
 
 
 def example_build_jsonplaceholder_mcp():
@@ -80,6 +81,8 @@ STEP 6 - REPORT:
 Provide a summary of what was built and how to use it.
 """
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         result = agent.invoke(task)
         return result
@@ -103,6 +106,8 @@ Build a simple calculator MCP server with basic math operations.
 Each tool should accept parameters 'a' and 'b' (both numbers).
 """
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         result = agent.invoke(task)
         return result
@@ -128,6 +133,8 @@ what it would do in production).
 Include proper error handling and authentication placeholder.
 """
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         result = agent.invoke(task)
         return result
@@ -143,14 +150,19 @@ def example_list_and_inspect():
 3. Create a summary report of available integrations
 """
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         result = agent.invoke(task)
         return result
 
 
 if __name__ == "__main__":
+    import logging
     import sys
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     examples = {
         "jsonplaceholder": example_build_jsonplaceholder_mcp,
         "calculator": example_build_simple_calculator_mcp,
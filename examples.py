@@ -5,7 +5,13 @@ This module contains example tasks demonstrating the capabilities of the Deep Ag
 with E2B sandbox integration.
 """
 
-from deep_agent import DeepAgentE2B
+import asyncio
+
+# deep_agent (LangChain, LangGraph, E2B) is imported inside each example so
+# the CLI only pays for it once an example actually runs
+
+# Examples run at once by run_all_examples; each holds a sandbox while it runs
+MAX_CONCURRENT_EXAMPLES = 4
 
 
 def example_github_analysis():
@@ -18,6 +24,8 @@ def example_github_analysis():
     4. Create a summary report
     """
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         result = agent.invoke(task)
         return result
@@ -32,6 +40,8 @@ def example_notion_organization():
     3. Add a section listing potential project ideas
     """
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         result = agent.invoke(task)
         return result
@@ -51,6 +61,8 @@ def example_github_to_notion():
     4. Format the information as a clean, organized page with sections for each repo
     """
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         result = agent.invoke(task)
         return result
@@ -66,6 +78,8 @@ def example_code_execution():
     4. Return the results in a formatted report
     """
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         result = agent.invoke(task)
         return result
@@ -82,6 +96,8 @@ def example_data_processing():
     5. Save both the data and report to files in the sandbox
     """
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         result = agent.invoke(task)
         return result
@@ -97,6 +113,8 @@ def example_package_testing():
     4. Display the results
     """
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         result = agent.invoke(task)
         return result
@@ -130,13 +148,29 @@ def example_multi_step_workflow():
     - List next steps for manual completion
     """
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         result = agent.invoke(task)
         return result
 
 
-def run_all_examples():
-    """Run all example tasks sequentially."""
+async def _run_example(name, example_func, semaphore):
+    """Run one (blocking) example on a worker thread once a slot is free."""
+    async with semaphore:
+        print(f"\n{'=' * 80}")
+        print(f"Running: {name}")
+        print("=" * 80)
+
+        try:
+            await asyncio.to_thread(example_func)
+            print(f"\n{name} completed successfully")
+        except Exception as e:
+            print(f"\n{name} failed: {str(e)}")
+
+
+async def arun_all_examples():
+    """Run all example tasks, up to MAX_CONCURRENT_EXAMPLES at a time."""
     examples = [
         ("GitHub Analysis", example_github_analysis),
         ("Notion Organization", example_notion_organization),
@@ -149,23 +183,30 @@ def run_all_examples():
 
     print("Running all example tasks...\n")
 
-    for name, example_func in examples:
-        print(f"\n{'=' * 80}")
-        print(f"Running: {name}")
-        print("=" * 80)
+    # Finished examples return their sandbox to the pool, where the next
+    # example to start picks it up; whatever is left is killed at the end
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXAMPLES)
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for name, example_func in examples:
+                tg.create_task(_run_example(name, example_func, semaphore))
+    finally:
+        from deep_agent import drain_sandbox_pool
 
-        try:
-            example_func()
-            print(f"\n{name} completed successfully")
-        except Exception as e:
-            print(f"\n{name} failed: {str(e)}")
+        drain_sandbox_pool()
 
-        print("\n")
+
+def run_all_examples():
+    """Run all example tasks (synchronous entry point)."""
+    asyncio.run(arun_all_examples())
 
 
 if __name__ == "__main__":
+    import logging
     import sys
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     if len(sys.argv) > 1:
         example_name = sys.argv[1].lower()
         examples_map = {
@@ -1,36 +1,104 @@
 """Helper script to inspect sandbox files and command outputs."""
+import json
+import logging
 import sys
-from deep_agent import DeepAgentE2B
+import time
+from pathlib import Path
+
+# Idle window: the agent extends the timeout while it works, so short
+# inspections do not keep the sandbox billed for a fixed two minutes
+SANDBOX_TIMEOUT = 30
+
+# The sandbox is left running between invocations and reconnected by ID, so
+# repeated inspections skip sandbox creation and MCP bootstrap
+STATE_FILE = Path.home() / ".cache" / "e2b_inspect" / "sandbox.json"
+
+
+def _load_sandbox(fresh: bool):
+    """Reconnect to the sandbox left by the previous run, if it has not expired."""
+    if fresh or not STATE_FILE.exists():
+        return None
+    from e2b import Sandbox
+
+    try:
+        state = json.loads(STATE_FILE.read_text())
+        if state["expires_at"] <= time.time():
+            return None
+        return Sandbox.connect(state["sandbox_id"], timeout=SANDBOX_TIMEOUT)
+    except Exception as e:
+        print(f"Could not reconnect to previous sandbox ({e}); creating a new one")
+        return None
+
+
+def _save_sandbox(sandbox):
+    """Give the sandbox a full idle window for the next run and record its ID and expiry."""
+    try:
+        sandbox.set_timeout(SANDBOX_TIMEOUT)
+    except Exception as e:
+        print(f"Could not keep the sandbox for the next run ({e})")
+        return
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    STATE_FILE.write_text(json.dumps({
+        "sandbox_id": sandbox.sandbox_id,
+        "expires_at": time.time() + SANDBOX_TIMEOUT,
+    }))
 
-if len(sys.argv) < 2:
-    print("Usage: uv run inspect_sandbox.py <task>")
+
+args = sys.argv[1:]
+fresh = "--fresh" in args
+if fresh:
+    args.remove("--fresh")
+
+if not args:
+    print("Usage: uv run inspect_sandbox.py [--fresh] <task>")
     print("\nExamples:")
     print('  uv run inspect_sandbox.py "List all Python files in /home/user"')
     print('  uv run inspect_sandbox.py "Read the file audit_repos.py"')
     print('  uv run inspect_sandbox.py "Show the last 50 lines of stdout from running audit_repos.py"')
+    print("\n  --fresh   Start a new sandbox instead of reconnecting to the previous one")
     sys.exit(1)
 
-task = " ".join(sys.argv[1:])
+# Heavy imports are deferred until the arguments are known to be valid
+from dotenv import load_dotenv
+from deep_agent import DeepAgentE2B
+
+task = " ".join(args)
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+# Buffer the transcript when it is captured to a file or pipe
+if not sys.stdout.isatty():
+    sys.stdout.reconfigure(line_buffering=False, write_through=False)
 
 print(f"Executing: {task}\n")
 print("=" * 60)
 
 try:
-    with DeepAgentE2B(sandbox_timeout=120) as agent:
-        result = agent.invoke(task)
-        
+    # A new sandbox is not pooled or killed on close, so it outlives this run
+    with DeepAgentE2B(
+        sandbox_timeout=SANDBOX_TIMEOUT,
+        reuse_sandbox=False,
+        keep_sandbox=True,
+        sandbox=_load_sandbox(fresh),
+        extend_on_progress=True,
+    ) as agent:
+        # Recorded even when the task fails, so the sandbox is not orphaned
+        try:
+            result = agent.invoke(task)
+        finally:
+            _save_sandbox(agent.sandbox)
+
         print("\n" + "=" * 60)
         print("RESULT")
         print("=" * 60)
-        
+
         if "messages" in result:
-            for msg in result["messages"]:
-                if hasattr(msg, "content"):
-                    print(msg.content)
-                else:
-                    print(msg)
+            print("\n".join(
+                str(msg.content) if hasattr(msg, "content") else str(msg)
+                for msg in result["messages"]
+            ))
+        sys.stdout.flush()
 except Exception as e:
     print(f"Error: {e}")
     import traceback
     traceback.print_exc()
-
@@ -8,21 +8,38 @@ NOTE: This is the legacy deepagents implementation. The project has migrated to
 See deep_agent.py for the new implementation.
 """
 
-import asyncio
+import hashlib
+import json
 import os
-from typing import Optional
+import shlex
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 import dotenv
-from deepagents import create_deep_agent
-from langchain_anthropic import ChatAnthropic
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from e2b import Sandbox
+from e2b import CommandExitException, Sandbox
 from e2b.sandbox.mcp import GithubOfficial, Notion, McpServer
 from e2b.exceptions import AuthenticationException
-from e2b_tools import E2BSandboxTools
+from e2b_tools import (
+    MCP_CLI_ENVS,
+    E2BSandboxTools,
+    drop_mcp_session,
+    mcp_http_client,
+    run_in_background_loop,
+)
 from mcp_builder_tools import MCPBuilderTools
+from deep_agent import get_chat_model, mask_secret
+
+if TYPE_CHECKING:
+    # deepagents and the model/MCP clients are imported when the agent is built
+    from langchain_mcp_adapters.client import MultiServerMCPClient
 
 dotenv.load_dotenv()
 
+# Tool schemas listed by the sandbox MCP gateway, cached per set of configured
+# servers (the gateway URL and token change with every sandbox)
+MCP_TOOL_CACHE_DIR = Path.home() / ".cache" / "e2b_mcp"
+MCP_TOOL_CACHE_TTL = 3600
+
 
 class LegacyDeepAgentE2B:
     """
@@ -74,7 +91,7 @@ class LegacyDeepAgentE2B:
         self.sandbox: Optional[Sandbox] = None
         self.agent = None
         self.tools = []
-        self.mcp_client: Optional[MultiServerMCPClient] = None
+        self.mcp_client: Optional["MultiServerMCPClient"] = None
 
         # Initialize components
         self._setup_sandbox()
@@ -97,6 +114,8 @@ class LegacyDeepAgentE2B:
             mcp_servers_config["notion"] = notion
             print("  Notion MCP server configured")
 
+        self.mcp_server_names = sorted(mcp_servers_config)
+
         # Create MCP server instance
         if mcp_servers_config:
             mcp_servers = McpServer(**mcp_servers_config)
@@ -107,7 +126,7 @@ class LegacyDeepAgentE2B:
         # Create sandbox with environment variables and MCP servers
         try:
             self.sandbox = Sandbox.beta_create(
-                envs={"ANTHROPIC_API_KEY": self.anthropic_api_key},
+                envs={"ANTHROPIC_API_KEY": self.anthropic_api_key, **MCP_CLI_ENVS},
                 mcp=mcp_servers,
                 timeout=self.sandbox_timeout,
                 api_key=self.e2b_api_key,
@@ -124,7 +143,16 @@ class LegacyDeepAgentE2B:
             f"  E2B API key detected ({self._mask_secret(self.e2b_api_key)})"
         )
 
-        self._verify_sandbox_command_channel()
+        # Verify the command channel and register the MCP gateway with Claude
+        # CLI in a single command round trip
+        mcp_url = mcp_token = None
+        if mcp_servers:
+            mcp_url = self.sandbox.get_mcp_url()
+            try:
+                mcp_token = self.sandbox.get_mcp_token()
+            except AttributeError:
+                print("  Warning: MCP token not available, skipping MCP gateway setup")
+        self._bootstrap_sandbox(mcp_url if mcp_token else None, mcp_token)
 
         # Create E2B-native tools
         self.tools = E2BSandboxTools.create_tools(self.sandbox)
@@ -137,14 +165,9 @@ class LegacyDeepAgentE2B:
 
         # Configure Claude CLI + LangChain MCP adapters if servers were provided
         if mcp_servers:
-            mcp_url = self.sandbox.get_mcp_url()
-            try:
-                mcp_token = self.sandbox.get_mcp_token()
-                self._configure_mcp_gateway(mcp_url, mcp_token)
+            if mcp_token:
                 mcp_langchain_tools = self._load_mcp_langchain_tools(mcp_url, mcp_token)
                 self.tools.extend(mcp_langchain_tools)
-            except AttributeError:
-                print("  Warning: MCP token not available, skipping MCP gateway setup")
         else:
             print("  No MCP servers detected; MCP tools will not be added.")
 
@@ -152,12 +175,10 @@ class LegacyDeepAgentE2B:
         """Initialize the deep agent with custom tools and configuration."""
         print("Initializing deep agent...")
 
-        # Create Claude model
-        model = ChatAnthropic(
-            model=self.model_name,
-            anthropic_api_key=self.anthropic_api_key,
-            temperature=0.7,
-        )
+        from deepagents import create_deep_agent
+
+        # Claude model, shared with every other agent using this key and model
+        model = get_chat_model(self.anthropic_api_key, self.model_name)
 
         # Custom system prompt for E2B-integrated agent
         system_prompt = """You are an advanced autonomous agent with access to an E2B sandbox environment.
@@ -178,7 +199,7 @@ You have the following capabilities:
    - Use 'scaffold_mcp_server' to create new integration scaffolds
    - Use 'add_mcp_tool_to_server' to add tools to MCP servers
    - Use 'test_mcp_server' to validate MCP servers before deployment
-   - Use 'deploy_mcp_server' to make new integrations available
+   - Use 'deploy_mcp_server' to make new integrations available ('deploy_mcp_servers_batch' for several at once)
    - Use 'list_mcp_servers' to see all built MCP servers
 
 Your workflow should be:
@@ -227,7 +248,7 @@ Remember: You're operating in a secure E2B sandbox, so you can safely execute co
         print(f"\nTask: {task}\n")
         print("=" * 80)
 
-        response = asyncio.run(self.agent.ainvoke({"messages": [{"role": "user", "content": task}]}))
+        response = run_in_background_loop(self.agent.ainvoke({"messages": [{"role": "user", "content": task}]}))
 
         print("=" * 80)
         print("\nTask completed\n")
@@ -277,9 +298,15 @@ Remember: You're operating in a secure E2B sandbox, so you can safely execute co
                 print(f"\nError: {str(e)}\n")
 
     def close(self):
-        """Clean up resources (close sandbox)."""
-        if self.sandbox:
+        """Clean up resources (kill the sandbox so it stops billing before its timeout)."""
+        sandbox, self.sandbox = self.sandbox, None
+        if sandbox:
             print("\nClosing E2B sandbox...")
+            drop_mcp_session(sandbox.sandbox_id)
+            try:
+                sandbox.kill()
+            except Exception as exc:
+                print(f"  Warning: Failed to kill sandbox: {exc}")
             print("  Resources cleaned up")
         if self.mcp_client:
             print("  Releasing MCP client")
@@ -306,62 +333,127 @@ Remember: You're operating in a secure E2B sandbox, so you can safely execute co
                 "This typically indicates the E2B_API_KEY is invalid, expired, or rate-limited."
             ) from exc
 
-    def _verify_sandbox_command_channel(self):
-        """Ensure the sandbox command endpoint works before starting the agent."""
+    @staticmethod
+    def _mask_secret(value: Optional[str]) -> str:
+        """Return a redacted preview of a secret."""
+        return mask_secret(value)
+
+    def _bootstrap_sandbox(self, mcp_url: Optional[str] = None, mcp_token: Optional[str] = None):
+        """
+        Verify the sandbox command channel and, when a gateway is available,
+        register it with Claude CLI, all in one command round trip.
+        """
         print("  Verifying sandbox command channel...")
-        result = self._run_sandbox_command("echo E2B_SANDBOX_OK")
+        command = "echo E2B_SANDBOX_OK"
+        if mcp_url:
+            print("  Configuring Claude CLI with MCP gateway...")
+            command += (
+                f" && claude mcp add --transport http e2b-mcp-gateway {shlex.quote(mcp_url)}"
+                f" --header {shlex.quote(f'Authorization: Bearer {mcp_token}')}"
+            )
+
+        try:
+            result = self._run_sandbox_command(command, timeout=0 if mcp_url else 60)
+        except CommandExitException as exc:
+            # Newer E2B SDKs raise on non-zero exit; the exception carries the output
+            result = exc
 
-        if result.exit_code != 0:
+        if not (result.stdout or "").startswith("E2B_SANDBOX_OK"):
             raise RuntimeError(
                 "Sandbox command verification failed; inspect sandbox logs for details."
             )
         print("  Sandbox command channel verified")
 
-    @staticmethod
-    def _mask_secret(value: Optional[str]) -> str:
-        """Return a redacted preview of a secret."""
-        if not value:
-            return "<missing>"
-        if len(value) <= 8:
-            return f"{value[0]}***{value[-1]}"
-        return f"{value[:4]}...{value[-4:]}"
-
-    def _configure_mcp_gateway(self, mcp_url: str, mcp_token: str):
-        """Register the sandbox MCP gateway with Claude CLI."""
-        print("  Configuring Claude CLI with MCP gateway...")
-        result = self._run_sandbox_command(
-            f'claude mcp add --transport http e2b-mcp-gateway {mcp_url} --header "Authorization: Bearer {mcp_token}"',
-            timeout=0,
-        )
-
-        if result.exit_code == 0:
-            print("  Claude CLI configured with MCP gateway")
-        else:
-            print(f"  Warning: MCP gateway setup had issues: {result.stderr}")
+        if mcp_url:
+            if result.exit_code == 0:
+                print("  Claude CLI configured with MCP gateway")
+            else:
+                print(f"  Warning: MCP gateway setup had issues: {result.stderr}")
 
     def _load_mcp_langchain_tools(self, mcp_url: str, mcp_token: str):
         """
         Use langchain-mcp-adapters so LangChain/LangGraph can observe native MCP tools.
 
+        The gateway's tool schemas are cached on disk per set of configured
+        servers, so a recent listing is rebuilt locally instead of fetched.
+
         Returns:
             List of LangChain Tool instances backed by the E2B MCP gateway.
         """
         print("  Loading MCP tools via langchain-mcp-adapters...")
-        self.mcp_client = MultiServerMCPClient(
-            {
-                "e2b_mcp_gateway": {
-                    "transport": "streamable_http",
-                    "url": mcp_url,
-                    "headers": {"Authorization": f"Bearer {mcp_token}"},
-                }
-            }
-        )
+        from langchain_mcp_adapters.client import MultiServerMCPClient
+
+        connection = {
+            "transport": "streamable_http",
+            "url": mcp_url,
+            "headers": {"Authorization": f"Bearer {mcp_token}"},
+            # Every tool call opens a new MCP session; share the connection pool
+            "httpx_client_factory": mcp_http_client,
+        }
+        self.mcp_client = MultiServerMCPClient({"e2b_mcp_gateway": connection})
+
+        tools = self._cached_mcp_tools(connection)
+        if tools is not None:
+            print(f"  Loaded {len(tools)} MCP tools from cache")
+            return tools
 
         try:
-            tools = asyncio.run(self.mcp_client.get_tools())
+            tools = run_in_background_loop(self.mcp_client.get_tools(), timeout=30)
             print(f"  Loaded {len(tools)} MCP tools via langchain-mcp-adapters")
-            return tools
         except Exception as exc:
             print(f"  Warning: Failed to load MCP tools: {exc}")
             self.mcp_client = None
             return []
+
+        self._store_mcp_tools(tools)
+        return tools
+
+    def _mcp_tool_cache_path(self) -> Path:
+        """Cache file for the tool schemas of the configured MCP servers."""
+        from importlib.metadata import version
+
+        key = json.dumps(
+            {"servers": self.mcp_server_names, "adapters": version("langchain-mcp-adapters")},
+            sort_keys=True,
+        )
+        return MCP_TOOL_CACHE_DIR / f"tools-{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def _cached_mcp_tools(self, connection: dict) -> Optional[list]:
+        """Rebuild the MCP tools from a cached listing, or None if there is no fresh one."""
+        from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+        from mcp.types import Tool
+
+        path = self._mcp_tool_cache_path()
+        try:
+            if time.time() - path.stat().st_mtime > MCP_TOOL_CACHE_TTL:
+                return None
+            return [
+                convert_mcp_tool_to_langchain_tool(
+                    None, Tool(**spec), connection=connection, server_name="e2b_mcp_gateway"
+                )
+                for spec in json.loads(path.read_text())
+            ]
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            # Unreadable or written by an incompatible version; refetch
+            print(f"  Warning: Discarding MCP tool cache: {exc}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def _store_mcp_tools(self, tools: list):
+        """Write the schemas of freshly listed MCP tools to the cache."""
+        if not tools:
+            return
+        path = self._mcp_tool_cache_path()
+        specs = [
+            {"name": tool.name, "description": tool.description, "inputSchema": tool.args_schema}
+            for tool in tools
+        ]
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(specs))
+            tmp.replace(path)
+        except OSError as exc:
+            print(f"  Warning: Could not cache MCP tools: {exc}")
@@ -22,39 +22,43 @@ def main():
         envs={"ANTHROPIC_API_KEY": anthropic_api_key}, mcp=mcp_servers, timeout=600
     )
 
-    # Get MCP connection details and configure Claude CLI
-    mcp_url = sandbox.beta_get_mcp_url()
-    mcp_token = sandbox.beta_get_mcp_token()
+    # Always tear the sandbox down, whichever step below fails
+    try:
+        # Get MCP connection details and configure Claude CLI
+        mcp_url = sandbox.beta_get_mcp_url()
+        mcp_token = sandbox.beta_get_mcp_token()
 
-    result = sandbox.commands.run(
-        f'claude mcp add --transport http e2b-mcp-gateway {mcp_url} --header "Authorization: Bearer {mcp_token}"',
-        timeout=0,
-    )
-    print(result.stdout)
+        result = sandbox.commands.run(
+            f'claude mcp add --transport http e2b-mcp-gateway {mcp_url} --header "Authorization: Bearer {mcp_token}"',
+            timeout=0,
+        )
+        print(result.stdout)
 
-    list_mcp_result = sandbox.commands.run(
-        f"claude mcp list",
-        timeout=0,
-        envs={"MCP_TIMEOUT": "120000"},
-    )
+        list_mcp_result = sandbox.commands.run(
+            f"claude mcp list",
+            timeout=0,
+            envs={"MCP_TIMEOUT": "120000"},
+        )
 
-    print(list_mcp_result.stdout)
+        print(list_mcp_result.stdout)
 
-    # Run task with Claude using MCP servers
-    task = """
-    Use the GitHub MCP server to list my repositories,
-    then use the Notion MCP server to create a page (search for any parent page to attach it to) summarizing
-    the top 3 repositories by stars.
-    """
+        # Run task with Claude using MCP servers
+        task = """
+        Use the GitHub MCP server to list my repositories,
+        then use the Notion MCP server to create a page (search for any parent page to attach it to) summarizing
+        the top 3 repositories by stars.
+        """
 
-    claude_result = sandbox.commands.run(
-        f'echo "{task}" | claude -p --dangerously-skip-permissions',
-        timeout=0,
-        envs={"MCP_TIMEOUT": "120000"},
-    )
+        claude_result = sandbox.commands.run(
+            f'echo "{task}" | claude -p --dangerously-skip-permissions',
+            timeout=0,
+            envs={"MCP_TIMEOUT": "120000"},
+        )
 
-    print(claude_result.stdout)
-    print(claude_result.stderr)
+        print(claude_result.stdout)
+        print(claude_result.stderr)
+    finally:
+        sandbox.kill()
 
 
 if __name__ == "__main__":
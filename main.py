@@ -4,14 +4,16 @@ Deep Agent E2B - Main Entry Point
 This is the primary entry point for running the Deep Agent with E2B sandbox integration.
 """
 
+import logging
 import sys
-from deep_agent import DeepAgentE2B
 
 
 def run_interactive():
     """Run the agent in interactive chat mode."""
     print("Deep Agent E2B - Interactive Mode\n")
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         agent.chat()
 
@@ -20,6 +22,8 @@ def run_task(task: str):
     """Run a single task and exit."""
     print("Deep Agent E2B - Task Mode\n")
 
+    from deep_agent import DeepAgentE2B
+
     with DeepAgentE2B() as agent:
         result = agent.invoke(task)
 
@@ -45,6 +49,14 @@ def run_task(task: str):
 
 def main():
     """Main entry point with CLI argument handling."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    # Answered before deep_agent (and LangChain, LangGraph, E2B) is imported
+    if sys.argv[1:2] in (["-h"], ["--help"]):
+        print("Usage: uv run main.py [task]")
+        print("\n  With a task, run it once and exit; without one, start an interactive chat.")
+        return
+
     if len(sys.argv) > 1:
         # Task mode: run with provided task
         task = " ".join(sys.argv[1:])
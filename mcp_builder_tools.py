@@ -6,80 +6,82 @@ custom MCP servers, enabling the agent to extend its own capabilities.
 """
 
 from langchain_core.tools import tool
-from e2b import Sandbox
+from e2b import CommandExitException, Sandbox
 from typing import Optional
+import base64
 import json
+import logging
+import shlex
+import string
+import textwrap
 
+from e2b_tools import PIP_LOCK_FILE
 
-class MCPBuilderTools:
-    """
-    Wrapper class for MCP server building operations that can be used as LangChain tools.
-    """
+logger = logging.getLogger(__name__)
 
-    def __init__(self, sandbox: Sandbox):
-        """
-        Initialize MCP builder tools.
 
-        Args:
-            sandbox: An active E2B sandbox instance
-        """
-        self.sandbox = sandbox
+def _write_files_command(directory: str, files: dict) -> str:
+    """
+    Build one shell command that creates ``directory`` and writes ``files`` into it.
 
-    @staticmethod
-    def create_tools(sandbox: Sandbox) -> list:
-        """
-        Create a list of LangChain tools for MCP server building operations.
+    Contents are base64-encoded, so braces, quotes and heredoc markers in the
+    generated code need no escaping.
 
-        Args:
-            sandbox: An active E2B sandbox instance
+    Args:
+        directory: Directory to create (with parents)
+        files: Mapping of file name (relative to directory) to text content
 
-        Returns:
-            List of LangChain tools
-        """
-        tools_instance = MCPBuilderTools(sandbox)
+    Returns:
+        Shell command string for sandbox.commands.run
+    """
+    steps = [f"mkdir -p {shlex.quote(directory)}"]
+    for name, content in files.items():
+        payload = base64.b64encode(content.encode()).decode()
+        steps.append(f"echo {payload} | base64 -d > {shlex.quote(f'{directory}/{name}')}")
+    return " && ".join(steps)
 
-        @tool
-        def scaffold_mcp_server(
-            server_name: str,
-            description: str,
-            api_base_url: Optional[str] = None,
-        ) -> dict:
-            """
-            Create a new MCP server scaffold with basic structure.
 
-            This creates a complete MCP server template ready for adding custom tools.
-            The server will be created in /home/user/mcp_servers/{server_name}/
+def _deploy_command(server_name: str) -> str:
+    """
+    Build the shell command that deploys a server for local (stdio) use.
 
-            Args:
-                server_name: Name of the MCP server (e.g., 'slack', 'stripe', 'jsonplaceholder')
-                description: Brief description of what this MCP server does
-                api_base_url: Optional base URL for the API this server wraps (e.g., 'https://api.slack.com')
+    Writes the server's mcp_config.json and registers it with Claude CLI
+    (similar to how the E2B MCP gateway is added).
 
-            Returns:
-                Dictionary with server_path, files_created, and next_steps
-            """
-            server_path = f"/home/user/mcp_servers/{server_name}"
+    Args:
+        server_name: Name of the MCP server under /home/user/mcp_servers
 
-            # Create directory structure
-            tools_instance.sandbox.commands.run(
-                f"mkdir -p {server_path}", timeout=10
-            )
+    Returns:
+        Shell command string for sandbox.commands.run
+    """
+    server_path = f"/home/user/mcp_servers/{server_name}"
+    config = {
+        "mcpServers": {
+            server_name: {
+                "command": "python",
+                "args": [f"{server_path}/server.py"],
+            }
+        }
+    }
+    return (
+        _write_files_command(server_path, {"mcp_config.json": json.dumps(config, indent=2)})
+        + f" && claude mcp add {shlex.quote(server_name)} --command python"
+        f" --args {shlex.quote(f'{server_path}/server.py')}"
+    )
 
-            # Generate API configuration section
-            api_config = ""
-            if api_base_url:
-                api_config = f'''# API configuration
-API_BASE_URL = "{api_base_url}"
-API_TOKEN = os.environ.get("{server_name.upper()}_API_TOKEN", "")
-'''
 
-            httpx_import = "import httpx" if api_base_url else ""
+# Insertion points emitted by scaffold_mcp_server; each new tool is spliced in
+# just above them, so the markers stay in place for the next addition
+_TOOL_DEF_MARKER = "# <INSERT_TOOL_DEF>"
+_DISPATCH_MARKER = "# <INSERT_DISPATCH>"
+
 
-            # Generate server.py template
-            server_template = f'''"""
-{description}
+# Generated server.py; the markers are where add_mcp_tool_to_server splices
+# new tools. Built once at import, so scaffolding is a single substitute() pass
+_SERVER_TPL = string.Template('''"""
+$description
 
-Auto-generated MCP server for {server_name}.
+Auto-generated MCP server for $server_name.
 """
 
 import asyncio
@@ -87,12 +89,12 @@ import os
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 import mcp.server.stdio
-{httpx_import}
+$httpx_import
 
 # Initialize MCP server
-server = Server("{server_name}")
+server = Server("$server_name")
 
-{api_config}
+$api_config
 # Tool implementations will be added below
 # Use @server.list_tools() and @server.call_tool() decorators
 
@@ -100,21 +102,21 @@ server = Server("{server_name}")
 async def list_tools() -> list[Tool]:
     """List available tools."""
     return [
-        # Tools will be added here
         Tool(
             name="example_tool",
             description="Example tool - replace with actual implementation",
-            inputSchema={{
+            inputSchema={
                 "type": "object",
-                "properties": {{
-                    "param": {{
+                "properties": {
+                    "param": {
                         "type": "string",
                         "description": "Example parameter"
-                    }}
-                }},
+                    }
+                },
                 "required": ["param"]
-            }}
-        )
+            }
+        ),
+        $tool_def_marker
     ]
 
 
@@ -125,14 +127,16 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         param = arguments.get("param", "")
         return [TextContent(
             type="text",
-            text=f"Example response for: {{param}}"
-        )]
-    else:
-        return [TextContent(
-            type="text",
-            text=f"Unknown tool: {{name}}"
+            text=f"Example response for: {param}"
         )]
 
+    $dispatch_marker
+
+    return [TextContent(
+        type="text",
+        text=f"Unknown tool: {name}"
+    )]
+
 
 async def main():
     """Run the MCP server."""
@@ -146,17 +150,11 @@ async def main():
 
 if __name__ == "__main__":
     asyncio.run(main())
-'''
-
-            # Write server file
-            tools_instance.sandbox.files.write(
-                f"{server_path}/server.py", server_template
-            )
+''')
 
-            # Create README
-            readme_template = f'''# {server_name} MCP Server
+_README_TPL = string.Template('''# $server_name MCP Server
 
-{description}
+$description
 
 ## Setup
 
@@ -170,7 +168,7 @@ python server.py
 
 ## Configuration
 
-{f"Set environment variable: `{server_name.upper()}_API_TOKEN`" if api_base_url else "No configuration needed yet."}
+$configuration
 
 ## Available Tools
 
@@ -181,10 +179,156 @@ python server.py
 1. Implement actual tools in server.py
 2. Test with `test_mcp_server` tool
 3. Deploy with `deploy_mcp_server` tool
+''')
+
+
+# Replaces the first occurrence of each (old, new) pair in a file inside the
+# sandbox, so add_mcp_tool_to_server never downloads or re-uploads the server
+# source. Nothing is written unless every anchor is present.
+# Invoked as: python3 -c _SPLICE_SCRIPT <path>, with the pairs sent on stdin as
+# one line of base64 JSON, so their size is not bound by command-line limits
+_SPLICE_SCRIPT = """
+import base64, json, sys
+# Read stdin first: the client is still sending it while the script starts
+pairs = json.loads(base64.b64decode(sys.stdin.readline()))
+path = sys.argv[1]
+try:
+    code = open(path).read()
+except FileNotFoundError:
+    print("MISSING")
+    sys.exit()
+if any(old not in code for old, _ in pairs):
+    print("NO_MARKER")
+    sys.exit()
+for old, new in pairs:
+    code = code.replace(old, new, 1)
+open(path, "w").write(code)
+print("OK")
+"""
+
+
+# Prepares the sandbox for generated servers: the servers directory plus the
+# packages they import, so deploying a server does not wait on pip. pip only
+# runs if the packages are missing, and its output is kept for inspection.
+_WARMUP_LOG = "/tmp/mcp_builder_warmup.log"
+_WARMUP_COMMAND = (
+    "mkdir -p /home/user/mcp_servers && "
+    "{ python3 -c 'import mcp, httpx' 2>/dev/null || "
+    f"flock {PIP_LOCK_FILE} pip install -q --prefer-binary mcp httpx; }} >{_WARMUP_LOG} 2>&1"
+)
+
+# Sandboxes already warmed up by this process (pooled and shared sandboxes get
+# a new MCPBuilderTools per agent)
+_WARMED_SANDBOXES: set = set()
+
+
+# Separates the sections of combined command output (test_mcp_server's
+# checks, deploy_mcp_servers_batch's per-server results)
+_OUTPUT_SEPARATOR = "---E2B---"
+
+
+class MCPBuilderTools:
+    """
+    Wrapper class for MCP server building operations that can be used as LangChain tools.
+    """
+
+    def __init__(self, sandbox: Sandbox):
+        """
+        Initialize MCP builder tools.
+
+        Args:
+            sandbox: An active E2B sandbox instance
+        """
+        self.sandbox = sandbox
+        self._warm_up()
+
+    def _warm_up(self):
+        """
+        Start the sandbox warm-up in the background, once per sandbox.
+
+        Failing to start it only means the first deploy installs the
+        packages itself.
+        """
+        sandbox_id = getattr(self.sandbox, "sandbox_id", None)
+        if sandbox_id in _WARMED_SANDBOXES:
+            return
+        try:
+            self.sandbox.commands.run(_WARMUP_COMMAND, background=True, timeout=300)
+        except Exception as exc:
+            logger.warning("Could not start MCP builder warm-up: %s", exc)
+            return
+        if sandbox_id is not None:
+            _WARMED_SANDBOXES.add(sandbox_id)
+
+    @staticmethod
+    def create_tools(sandbox: Sandbox) -> list:
+        """
+        Create a list of LangChain tools for MCP server building operations.
+
+        Args:
+            sandbox: An active E2B sandbox instance
+
+        Returns:
+            List of LangChain tools
+        """
+        tools_instance = MCPBuilderTools(sandbox)
+
+        @tool
+        def scaffold_mcp_server(
+            server_name: str,
+            description: str,
+            api_base_url: Optional[str] = None,
+        ) -> dict:
+            """
+            Create a new MCP server scaffold with basic structure.
+
+            This creates a complete MCP server template ready for adding custom tools.
+            The server will be created in /home/user/mcp_servers/{server_name}/
+
+            Args:
+                server_name: Name of the MCP server (e.g., 'slack', 'stripe', 'jsonplaceholder')
+                description: Brief description of what this MCP server does
+                api_base_url: Optional base URL for the API this server wraps (e.g., 'https://api.slack.com')
+
+            Returns:
+                Dictionary with server_path, files_created, and next_steps
+            """
+            server_path = f"/home/user/mcp_servers/{server_name}"
+
+            # Generate API configuration section
+            api_config = ""
+            if api_base_url:
+                api_config = f'''# API configuration
+API_BASE_URL = "{api_base_url}"
+API_TOKEN = os.environ.get("{server_name.upper()}_API_TOKEN", "")
 '''
 
-            tools_instance.sandbox.files.write(
-                f"{server_path}/README.md", readme_template
+            httpx_import = "import httpx" if api_base_url else ""
+
+            server_template = _SERVER_TPL.substitute(
+                server_name=server_name,
+                description=description,
+                httpx_import=httpx_import,
+                api_config=api_config,
+                tool_def_marker=_TOOL_DEF_MARKER,
+                dispatch_marker=_DISPATCH_MARKER,
+            )
+            readme_template = _README_TPL.substitute(
+                server_name=server_name,
+                description=description,
+                configuration=(
+                    f"Set environment variable: `{server_name.upper()}_API_TOKEN`"
+                    if api_base_url
+                    else "No configuration needed yet."
+                ),
+            )
+
+            # Create the directory and both files in one sandbox round trip
+            tools_instance.sandbox.commands.run(
+                _write_files_command(
+                    server_path, {"server.py": server_template, "README.md": readme_template}
+                ),
+                timeout=15,
             )
 
             return {
@@ -222,64 +366,54 @@ python server.py
             """
             server_path = f"/home/user/mcp_servers/{server_name}"
 
-            # Read current server file
-            result = tools_instance.sandbox.commands.run(
-                f"cat {server_path}/server.py", timeout=10
-            )
-
-            if result.exit_code != 0:
-                return {
-                    "status": "error",
-                    "error": f"Server {server_name} not found at {server_path}",
-                }
-
-            current_code = result.stdout
-
-            # Generate tool definition
-            tool_def = f'''
-        Tool(
+            # Generate tool definition; the schema is embedded as a one-line
+            # Python literal, so JSON true/false/null arrive as True/False/None
+            tool_def = f'''Tool(
             name="{tool_name}",
             description="{tool_description}",
-            inputSchema={json.dumps(parameters_schema, indent=16)}
-        ),'''
-
-            # Generate tool implementation with proper indentation
-            # First, normalize the implementation code by removing common leading whitespace
-            impl_lines = implementation_code.split("\n")
-            # Filter out empty lines for finding minimum indentation
-            non_empty_lines = [line for line in impl_lines if line.strip()]
-            if non_empty_lines:
-                # Find minimum indentation
-                min_indent = min(len(line) - len(line.lstrip()) for line in non_empty_lines)
-                # Remove that baseline indentation and add our target indentation (8 spaces)
-                indented_impl = "\n".join(
-                    "        " + line[min_indent:] if line.strip() else ""
-                    for line in impl_lines
-                )
-            else:
-                indented_impl = ""
+            inputSchema={parameters_schema!r}
+        ),
+        '''
+
+            # Re-indent the implementation to the body of its dispatch branch
+            indented_impl = textwrap.indent(textwrap.dedent(implementation_code), " " * 8)
 
-            tool_impl = f'''
-    if name == "{tool_name}":
+            tool_impl = f'''if name == "{tool_name}":
         # {tool_description}
 {indented_impl}
-'''
 
-            # Insert tool definition into list_tools
-            updated_code = current_code.replace(
-                "# Tools will be added here", f"# Tools will be added here\n{tool_def}"
+    '''
+
+            replacements = [
+                # Tool definition at the end of list_tools' list
+                [_TOOL_DEF_MARKER, tool_def + _TOOL_DEF_MARKER],
+                # Dispatch branch before call_tool's unknown-tool fallback
+                [_DISPATCH_MARKER, tool_impl + _DISPATCH_MARKER],
+            ]
+            payload = base64.b64encode(json.dumps(replacements).encode()).decode()
+
+            # Splice the file in place inside the sandbox; only the new tool
+            # crosses the network, never the server source. The stream stays
+            # open (there is no way to close stdin), hence the trailing newline.
+            handle = tools_instance.sandbox.commands.run(
+                f"python3 -c {shlex.quote(_SPLICE_SCRIPT)} {shlex.quote(f'{server_path}/server.py')}",
+                background=True,
+                stdin=True,
+                timeout=15,
             )
+            tools_instance.sandbox.commands.send_stdin(handle.pid, payload + "\n")
+            result = handle.wait()
 
-            # Insert tool implementation into call_tool
-            updated_code = updated_code.replace(
-                'return [TextContent(\n            type="text",\n            text=f"Unknown tool: {name}"\n        )]',
-                f'{tool_impl}\n    \n    return [TextContent(\n            type="text",\n            text=f"Unknown tool: {{name}}"\n        )]',
-            )
-
-            # Write updated server file
-            tools_instance.sandbox.files.write(
-                f"{server_path}/server.py", updated_code
-            )
+            if result.stdout.strip() == "MISSING":
+                return {
+                    "status": "error",
+                    "error": f"Server {server_name} not found at {server_path}",
+                }
+            if result.stdout.strip() == "NO_MARKER":
+                return {
+                    "status": "error",
+                    "error": f"{server_path}/server.py has no insertion markers; re-create it with scaffold_mcp_server",
+                }
 
             return {
                 "status": "success",
@@ -308,47 +442,40 @@ python server.py
             """
             server_path = f"/home/user/mcp_servers/{server_name}"
 
-            # Check if server exists
-            check_result = tools_instance.sandbox.commands.run(
-                f"test -f {server_path}/server.py && echo 'exists' || echo 'not found'",
-                timeout=5,
+            server_file = shlex.quote(f"{server_path}/server.py")
+            tool_pattern = shlex.quote(f'name="{test_tool}"')
+
+            # Existence check, syntax check and both tool counts in one round
+            # trip; the sections of the output are split on _OUTPUT_SEPARATOR
+            result = tools_instance.sandbox.commands.run(
+                f"if [ ! -f {server_file} ]; then echo MISSING; exit 0; fi; "
+                f"python3 -m py_compile {server_file} 2>&1; echo \"{_OUTPUT_SEPARATOR} $?\"; "
+                f"grep -Fc -e {tool_pattern} {server_file}; echo {_OUTPUT_SEPARATOR}; "
+                f"grep -Fc 'Tool(' {server_file}; true",
+                timeout=15,
             )
 
-            if "not found" in check_result.stdout:
+            if result.stdout.strip() == "MISSING":
                 return {
                     "status": "error",
                     "error": f"Server {server_name} not found at {server_path}",
                 }
 
-            # Test Python syntax (validates the file can be compiled)
-            syntax_result = tools_instance.sandbox.commands.run(
-                f"python3 -m py_compile {server_path}/server.py",
-                timeout=10,
-            )
+            compile_output, counts, tools_count_output = result.stdout.rsplit(_OUTPUT_SEPARATOR, 2)
+            compile_status, tool_matches = counts.split()
 
-            if syntax_result.exit_code != 0:
+            # Test Python syntax (validates the file can be compiled)
+            if compile_status != "0":
                 return {
                     "status": "error",
                     "server_name": server_name,
                     "error": "Syntax error in server.py",
-                    "stderr": syntax_result.stderr,
+                    "stderr": compile_output.strip(),
                 }
 
-            # Verify the expected tool exists in the server
-            grep_result = tools_instance.sandbox.commands.run(
-                f'grep -c \'name="{test_tool}"\' {server_path}/server.py || echo "0"',
-                timeout=5,
-            )
-
-            tool_found = grep_result.stdout.strip() != "0"
-
-            # Count total tools defined
-            tools_count_result = tools_instance.sandbox.commands.run(
-                f"grep -c 'Tool(' {server_path}/server.py || echo '0'",
-                timeout=5,
-            )
-
-            tools_count = int(tools_count_result.stdout.strip() or "0")
+            # Verify the expected tool exists, and count total tools defined
+            tool_found = tool_matches != "0"
+            tools_count = int(tools_count_output.strip() or "0")
 
             return {
                 "status": "success",
@@ -377,27 +504,14 @@ python server.py
             server_path = f"/home/user/mcp_servers/{server_name}"
 
             if deployment_mode == "local":
-                # For local deployment, we create a config entry
-                # that can be used with claude mcp add
-                config = {
-                    "mcpServers": {
-                        server_name: {
-                            "command": "python",
-                            "args": [f"{server_path}/server.py"],
-                        }
-                    }
-                }
-
-                # Save config
-                tools_instance.sandbox.files.write(
-                    f"{server_path}/mcp_config.json", json.dumps(config, indent=2)
-                )
-
-                # Add to Claude CLI (similar to how E2B MCP gateway is added)
-                add_result = tools_instance.sandbox.commands.run(
-                    f'claude mcp add {server_name} --command python --args "{server_path}/server.py"',
-                    timeout=30,
-                )
+                # Write the config and register it in one round trip
+                try:
+                    add_result = tools_instance.sandbox.commands.run(
+                        _deploy_command(server_name), timeout=30
+                    )
+                except CommandExitException as e:
+                    # The exception carries the same stdout/stderr/exit_code
+                    add_result = e
 
                 return {
                     "status": "success" if add_result.exit_code == 0 else "partial",
@@ -414,6 +528,57 @@ python server.py
                     "error": f"Deployment mode '{deployment_mode}' not yet implemented",
                 }
 
+        @tool
+        def deploy_mcp_servers_batch(server_names: list[str]) -> dict:
+            """
+            Deploy several MCP servers locally (stdio) in a single sandbox command.
+
+            Prefer this over repeated deploy_mcp_server calls when more than
+            one server is ready.
+
+            Args:
+                server_names: Names of the MCP servers to deploy
+
+            Returns:
+                Dictionary with overall status and per-server deployment results
+            """
+            if not server_names:
+                return {"status": "error", "error": "No servers specified"}
+
+            # Each deploy runs even if an earlier one failed; its exit status
+            # follows on a separator line of its own
+            command = "; ".join(
+                f"{_deploy_command(name)}; printf '\\n%s %s\\n' {_OUTPUT_SEPARATOR} $?"
+                for name in server_names
+            )
+            try:
+                result = tools_instance.sandbox.commands.run(
+                    command, timeout=30 * len(server_names)
+                )
+            except CommandExitException as e:
+                result = e
+
+            deployed, output = [], []
+            for line in result.stdout.splitlines():
+                if not line.startswith(_OUTPUT_SEPARATOR):
+                    output.append(line)
+                    continue
+                name = server_names[len(deployed)]
+                deployed.append({
+                    "server_name": name,
+                    "status": "success" if line.split()[-1] == "0" else "partial",
+                    "config_path": f"/home/user/mcp_servers/{name}/mcp_config.json",
+                    "stdout": "\n".join(output).strip(),
+                })
+                output = []
+
+            return {
+                "status": "success" if all(d["status"] == "success" for d in deployed) else "partial",
+                "deployment_mode": "local_stdio",
+                "servers": deployed,
+                "stderr": result.stderr,
+            }
+
         @tool
         def list_mcp_servers() -> dict:
             """
@@ -422,31 +587,20 @@ python server.py
             Returns:
                 Dictionary with list of servers and their details
             """
+            # One line per server directory: name, tab, third line of its
+            # README (the description), all in a single round trip
             result = tools_instance.sandbox.commands.run(
-                "ls -la /home/user/mcp_servers/ 2>/dev/null || echo 'No servers found'",
+                'for d in /home/user/mcp_servers/*/; do [ -d "$d" ] || continue; '
+                'printf "%s\\t%s\\n" "$(basename "$d")" "$(sed -n 3p "$d/README.md" 2>/dev/null)"; done',
                 timeout=10,
             )
 
             servers = []
-            if "No servers found" not in result.stdout:
-                lines = result.stdout.strip().split("\n")[3:]  # Skip ., .., total
-                for line in lines:
-                    parts = line.split()
-                    if len(parts) >= 9:
-                        server_name = parts[-1]
-                        # Read README to get description
-                        readme_result = tools_instance.sandbox.commands.run(
-                            f"head -n 3 /home/user/mcp_servers/{server_name}/README.md | tail -n 1",
-                            timeout=5,
-                        )
-                        description = (
-                            readme_result.stdout.strip()
-                            if readme_result.exit_code == 0
-                            else "No description"
-                        )
-                        servers.append(
-                            {"name": server_name, "description": description}
-                        )
+            for line in result.stdout.splitlines():
+                server_name, _, description = line.partition("\t")
+                servers.append(
+                    {"name": server_name, "description": description.strip() or "No description"}
+                )
 
             return {
                 "status": "success",
@@ -460,5 +614,6 @@ python server.py
             add_mcp_tool_to_server,
             test_mcp_server,
             deploy_mcp_server,
+            deploy_mcp_servers_batch,
             list_mcp_servers,
         ]
@@ -1,5 +1,9 @@
 """Test GitHub MCP access - check what we can actually access."""
+import logging
 from deep_agent import DeepAgentE2B
+from test_github_repos import check_repos
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 print("=" * 60)
 print("GitHub Access Test")
@@ -35,6 +39,11 @@ try:
         If there are no repositories, report that clearly.
         """)
         print("Result:", result3)
+
+        # Test 4: test_github_repos' check, on the same sandbox instead of
+        # paying for a second sandbox start-up and MCP bootstrap
+        print("\n4. Testing repository listing with commit details...")
+        check_repos(agent)
         
 except Exception as e:
     print(f"\n[ERROR] Test failed: {e}")